@@ -0,0 +1,124 @@
+import ast
+from importlib import import_module
+from importlib.util import find_spec
+import os
+from pathlib import Path
+import sys
+from threading import RLock
+from typing import Any, Iterable
+
+from autumn.core.register import Component, parse_component, register
+from autumn.exceptions import AutomnConfigurationError
+
+_DECORATORS = ("component", "scope", "factory")
+
+
+def _get_name(node: ast.expr) -> str | None:
+    match node:
+        case ast.Name(id=name) | ast.Attribute(attr=name):
+            return name
+        case ast.Constant(value=str(name)):
+            return name
+    return None
+
+
+def _get_declarations(source: str) -> set[str]:
+    # Names a module can provide: classes decorated with component or scope,
+    # functions decorated with factory, their interfaces and scope names. Nothing is evaluated, so aliased or
+    # computed decorators are not recognized.
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call) or _get_name(decorator.func) not in _DECORATORS:
+                continue
+            names.add(node.name)
+            arguments = decorator.args[:1] + [k.value for k in decorator.keywords if k.arg in ("interface", "name")]
+            if getattr(node, "returns", None) is not None:
+                arguments.append(node.returns)
+            names.update(name for name in map(_get_name, arguments) if name is not None)
+    return names
+
+
+def _get_modules(package: str) -> Iterable[tuple[str, Path]]:
+    spec = find_spec(package)
+    if spec is None:
+        raise AutomnConfigurationError(f"Package `{package}` not found")
+    if not spec.submodule_search_locations:
+        yield package, Path(spec.origin)
+        return
+    for location in spec.submodule_search_locations:
+        root = Path(location)
+        for file in sorted(root.rglob("*.py")):
+            parts = file.relative_to(root).with_suffix("").parts
+            if parts[-1] == "__init__":
+                parts = parts[:-1]
+            yield ".".join((package, *parts)), file
+
+
+class _Discovery:
+    # Modules found by scanning packages are imported only when one of the
+    # names they declare is looked up by a started register
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self.pending: dict[str, set[str]] = {}
+        self.scans = 0
+
+    def scan(self, package: str) -> None:
+        with self._lock:
+            for module, file in _get_modules(package):
+                if module in sys.modules:
+                    continue
+                for name in _get_declarations(file.read_text()):
+                    self.pending.setdefault(name, set()).add(module)
+            self.scans += 1
+
+    def load(self, profiles: Iterable[str], names: Iterable[Any]) -> bool:
+        # Imports the modules declaring the names and, transitively, those
+        # declaring dependencies and scopes of the components they register.
+        # Returns whether any module was imported.
+        profiles = set(profiles)
+        queue = list(names)
+        imported = False
+        with self._lock:
+            while queue and self.pending:
+                name = queue.pop()
+                modules = self.pending.pop(name if isinstance(name, str) else getattr(name, "__name__", None), ())
+                modules = sorted(m for m in modules if m not in sys.modules)
+                if not modules:
+                    continue
+                registered = len(register._keys)
+                for module in modules:
+                    import_module(module)
+                imported = True
+                for component in list(register._keys.values())[registered:]:
+                    if set(component.profiles) <= profiles:
+                        queue.extend(_get_requirements(component))
+        return imported
+
+    def load_all(self, profiles: Iterable[str]) -> bool:
+        # Requirements of every active component registered so far
+        profiles = set(profiles)
+        if not self.pending:
+            return False
+        names = [name for component in register._keys.values() if set(component.profiles) <= profiles
+                 for name in _get_requirements(component)]
+        return self.load(profiles, names)
+
+    def after_fork(self) -> None:
+        # The lock could be held by a thread of the parent process
+        self._lock = RLock()
+
+
+def _get_requirements(component: Component) -> Iterable[Any]:
+    parse_component(component)
+    yield component.scope
+    for dependency in component.dependencies.values():
+        yield dependency.interface
+
+
+discovery = _Discovery()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=discovery.after_fork)
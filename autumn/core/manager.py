@@ -1,9 +1,15 @@
-from contextlib import contextmanager
+from contextlib import AbstractAsyncContextManager, AbstractContextManager, asynccontextmanager, contextmanager
 from dataclasses import dataclass
+import gc
+from pathlib import Path
 from types import MappingProxyType
-from typing import Any, LiteralString, Mapping, Self, Type, TypeVar
+from typing import Any, AsyncIterator, Iterable, Iterator, LiteralString, Mapping, Self, Type, TypeVar
 
-from autumn.core.scope import clear_caches
+from autumn.core.metrics import ResolutionMetrics, Sink, metrics
+from autumn.core.profiler import ComponentProfile, profiler
+from autumn.core.scope import PoolMetrics, SessionContext
+from autumn.core import snapshot
+from autumn.core.discovery import discovery
 
 from .register import Register, create_register_instance
 from autumn.exceptions import AutomnComponentNotFound, AutomnConfigurationError
@@ -13,21 +19,33 @@ from autumn.exceptions import AutomnComponentNotFound, AutomnConfigurationError
 class Config:
     active_profiles: list[str]
     properties: dict[str, Any]
+    snapshot: Path | None = None
 
     def copy(self) -> Self:
         return Config(active_profiles=self.active_profiles[:],
-                    properties=self.properties.copy())
+                    properties=self.properties.copy(),
+                    snapshot=self.snapshot)
 
 _T = TypeVar("_T")
 
 
 class _ManagerInstance:
 
-    def __init__(self, config: Config | None = None) -> None:
+    def __init__(self, config: Config | None = None, base: Register | None = None) -> None:
         self._register: Register | None = None
+        # Started register of the copied instance, unchanged parts of it
+        # are reused by start
+        self._base = base
+        # Instance of a child container and the overrides it was created with
+        self._parent: _ManagerInstance | None = None
+        self._overrides: Mapping[Any, Any] = {}
+        # Interfaces already looked up in discovery, since its last scan
+        self._loaded: set[Any] = set()
+        self._scans = 0
         self._config: Config = config or Config(active_profiles=[], 
                                       properties={})
         self.properties: Mapping[str, Any] | None = None  
+        self.warmup_report: Mapping[Type, float] = MappingProxyType({})
 
     def init_property(self, property_name: LiteralString, value: Any) -> None:
         self._config.properties[property_name] = value
@@ -36,23 +54,110 @@ class _ManagerInstance:
         for profile in profiles:
             self._config.active_profiles.append(profile)
 
-    def start(self):
-        clear_caches()
-        self._register = create_register_instance(self._config.active_profiles,
-                                                  self._config.properties.keys())
+    def init_snapshot(self, path: str | Path) -> None:
+        self._config.snapshot = Path(path)
+
+    def _create_register(self, base: Register | None = None, share_singletons: bool = False) -> Register:
+        profiles, properties = self._config.active_profiles, self._config.properties
+        base = base or self._base
+        if base is not None:
+            return create_register_instance(profiles, properties, base, share_singletons)
+        if self._config.snapshot is None:
+            return create_register_instance(profiles, properties)
+        digest = snapshot.fingerprint(profiles, properties)
+        register_instance = snapshot.load(self._config.snapshot, digest)
+        if register_instance is None:
+            register_instance = create_register_instance(profiles, properties)
+            snapshot.save(self._config.snapshot, register_instance, digest)
+        else:
+            register_instance.compile(properties)
+        return register_instance
+
+    def start(self, eager: bool = False, max_workers: int | None = None):
+        discovery.load_all(self._config.active_profiles)
+        self._register = self._create_register()
+        self._register.fill_pools()
         self.properties = MappingProxyType(self._config.properties)
+        if eager:
+            self.warmup_report = MappingProxyType(self._register.warm_up(max_workers))
+
+    def prepare_fork(self, freeze: bool, max_workers: int | None) -> None:
+        self.warmup_report = MappingProxyType(self._register.prepare_fork(max_workers))
+        if freeze:
+            gc.freeze()
+
+    def after_fork(self) -> None:
+        self._register.after_fork()
+
+    def stop(self, max_workers: int | None = None) -> None:
+        self._register.stop(max_workers)
+
+    async def astop(self) -> None:
+        await self._register.astop()
+
+    def child(self, overrides: Mapping[Any, Any]) -> "_ManagerInstance":
+        self.load(overrides)
+        instance = _ManagerInstance(self._config)
+        instance._parent = self
+        instance._overrides = overrides
+        instance._register = self._register.child(overrides)
+        instance.properties = self.properties
+        return instance
+
+    def close(self) -> None:
+        self._register.close()
+
+    async def aclose(self) -> None:
+        await self._register.aclose()
+
+    def load(self, interfaces: Iterable[Any]) -> None:
+        # Every interface is looked up in discovery once per scan, so that
+        # lookups of loaded interfaces do not take the discovery lock
+        if not discovery.pending:
+            return
+        if self._scans != discovery.scans:
+            self._loaded, self._scans = set(), discovery.scans
+        interfaces = [i for i in interfaces if i not in self._loaded]
+        if not interfaces:
+            return
+        if self._parent is not None:
+            register = self._parent.get_register()
+            self._parent.load(interfaces)
+            if self._parent.get_register() is not register:
+                self._register = self._parent.get_register().child(self._overrides)
+        # The rebuilt register takes over the cache of the previous one, so
+        # singletons are not built twice
+        elif discovery.load(self._config.active_profiles, interfaces):
+            self._register = self._create_register(self._register, share_singletons=True)
+            self._register.fill_pools()
+        self._loaded.update(interfaces)
 
     def get_instance(self, interface: _T, optional: bool = False) -> _T:
-        return self._register.get_instance(interface, 
-                                           self.properties or {},
-                                           optional)
+        if discovery.pending and (interface not in self._loaded or self._scans != discovery.scans):
+            self.load((interface, ))
+        return self._register.get_instance(interface, optional)
 
     def get_instances(self, interface: _T) -> list[_T]:
-        return self._register.get_instances(interface, self.properties or {})
+        if discovery.pending and (interface not in self._loaded or self._scans != discovery.scans):
+            self.load((interface, ))
+        return self._register.get_instances(interface)
+
+    async def aget_instance(self, interface: _T, optional: bool = False) -> _T:
+        if discovery.pending and (interface not in self._loaded or self._scans != discovery.scans):
+            self.load((interface, ))
+        return await self._register.aget_instance(interface, optional)
+
+    async def aget_instances(self, interface: _T) -> list[_T]:
+        if discovery.pending and (interface not in self._loaded or self._scans != discovery.scans):
+            self.load((interface, ))
+        return await self._register.aget_instances(interface)
     
     def get_config(self) -> Config:
         return self._config
 
+    def get_register(self) -> Register:
+        return self._register
+
 
 class _Manager:
 
@@ -71,22 +176,41 @@ class _Manager:
             raise AutomnConfigurationError("Attempn to initialize profile after dm start")
         self._instance.init_profiles(*profiles)
     
+    def init_snapshot(self, path: str | Path) -> None:
+        # The checked register is stored in the file and reused by the next
+        # start with the same declarations, profiles and property names
+        if self._started:
+            raise AutomnConfigurationError("Attempt to initialize snapshot after dm start")
+        self._instance.init_snapshot(path)
+
+    def discover(self, *packages: str) -> None:
+        # Modules of the packages are scanned for components without being
+        # imported, each of them is imported once a component it declares
+        # is needed
+        for package in packages:
+            discovery.scan(package)
+
     def init(self, test_mode=False) -> None:
         if self._started:
             raise AutomnConfigurationError("Attempn to initialize dm after start")
         self.test_mode = test_mode
     
     @contextmanager
-    def copy(self) -> None:
+    def copy(self, incremental: bool = False) -> None:
+        # An incremental copy of a started dm checks and compiles only the
+        # components affected by the change of profiles and properties, and
+        # shares the singletons of the others with the copied dm
         if not self.test_mode:
             raise AutomnConfigurationError("Attempt to stash frozen dm")
         config = self._instance.get_config()
         instance = self._instance
+        base = instance.get_register() if incremental and self._started else None
         self._started = False
-        self._instance = _ManagerInstance(config=config.copy())
-        yield
-        self._instance = instance
-        self._started = True
+        self._instance = _ManagerInstance(config=config.copy(), base=base)
+        try:
+            yield
+        finally:
+            self._restore(instance)
     
     @contextmanager
     def clear(self) -> None:
@@ -95,16 +219,94 @@ class _Manager:
         self._started = False
         instance = self._instance
         self._instance = _ManagerInstance()
-        yield
+        try:
+            yield
+        finally:
+            self._restore(instance)
+
+    def _restore(self, instance: _ManagerInstance) -> None:
+        # Singletons built by the temporary instance are destroyed, so their
+        # resources do not outlive the block
+        temporary, started = self._instance, self._started
         self._instance = instance
         self._started = True
+        if started:
+            temporary.stop()
 
     
-    def start(self) -> None:
+    def start(self, eager: bool = False, max_workers: int | None = None) -> None:
         if self._started:
             raise AutomnConfigurationError("Attempn to start dm after start")
-        self._instance.start()
+        self._instance.start(eager, max_workers)
         self._started = True
+
+    def stop(self, max_workers: int | None = None) -> None:
+        if not self._started:
+            raise AutomnConfigurationError("Attempt to stop dm before start")
+        self._instance.stop(max_workers)
+        self._started = False
+
+    async def astop(self) -> None:
+        if not self._started:
+            raise AutomnConfigurationError("Attempt to stop dm before start")
+        await self._instance.astop()
+        self._started = False
+
+    def prepare_fork(self, freeze: bool = False, max_workers: int | None = None) -> None:
+        # Builds the fork safe singletons, so that workers inherit them
+        # copy-on-write. Freezing moves all tracked objects to the permanent
+        # generation, collections in workers then do not write to their pages.
+        if not self._started:
+            raise AutomnConfigurationError("Attempt to prepare fork before dm start")
+        self._instance.prepare_fork(freeze, max_workers)
+
+    def after_fork(self) -> None:
+        # Called in the child process, singletons which are not fork safe
+        # are built again on demand
+        if not self._started:
+            raise AutomnConfigurationError("Attempt to handle fork before dm start")
+        self._instance.after_fork()
+
+    def enable_profiling(self) -> None:
+        # Resolution is recorded for containers started after this call,
+        # parsing for the components they are the first to use
+        profiler.enabled = True
+
+    def get_profile(self) -> Mapping[Type, ComponentProfile]:
+        return MappingProxyType(profiler.report())
+
+    def disable_profiling(self) -> None:
+        # Containers started before keep recording
+        profiler.enabled = False
+
+    def export_profile(self) -> str:
+        return profiler.export_folded()
+
+    def clear_profile(self) -> None:
+        profiler.clear()
+
+    def enable_metrics(self, sample_rate: float = 1.0, sink: Sink | None = None) -> None:
+        # Like profiling, resolutions are recorded for containers started
+        # after this call. The sink gets every sampled resolution.
+        if not 0 < sample_rate <= 1:
+            raise AutomnConfigurationError("Sample rate must be in (0, 1]")
+        metrics.sample_rate = sample_rate
+        metrics.sink = sink
+        metrics.enabled = True
+
+    def disable_metrics(self) -> None:
+        # Containers started before keep recording
+        metrics.enabled = False
+        metrics.sink = None
+
+    def get_metrics(self) -> Mapping[Type, ResolutionMetrics]:
+        return MappingProxyType(metrics.report())
+
+    def clear_metrics(self) -> None:
+        metrics.clear()
+
+    def get_warmup_report(self) -> Mapping[Type, float]:
+        return self._instance.warmup_report
     
     def get_instance(self, interface: _T, optional: bool=False):
         if not self._started:
@@ -116,6 +318,71 @@ class _Manager:
             raise AutomnConfigurationError("Attempn to get instance before dm start")
         return self._instance.get_instances(interface)
 
+    async def aget_instance(self, interface: _T, optional: bool=False):
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to get instance before dm start")
+        return await self._instance.aget_instance(interface, optional)
+
+    async def aget_instances(self, interface: _T) -> list[_T]:
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to get instance before dm start")
+        return await self._instance.aget_instances(interface)
+
+    def borrow(self, interface: _T) -> AbstractContextManager[_T]:
+        # The instance goes back to the pool of the component when the
+        # block is left
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to get instance before dm start")
+        self._instance.load((interface, ))
+        return self._instance.get_register().borrow(interface)
+
+    def aborrow(self, interface: _T) -> AbstractAsyncContextManager[_T]:
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to get instance before dm start")
+        self._instance.load((interface, ))
+        return self._instance.get_register().aborrow(interface)
+
+    def get_pool_metrics(self) -> Mapping[Type, PoolMetrics]:
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to get instance before dm start")
+        return MappingProxyType(self._instance.get_register().get_pool_metrics())
+
+    @contextmanager
+    def child(self, overrides: Mapping[Any, Any]) -> Iterator[_ManagerInstance]:
+        # A container resolving the given instances in place of the
+        # components of their interfaces. Only components depending on them
+        # are built again, singletons among them are destroyed on exit.
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to create child before dm start")
+        instance = self._instance.child(overrides)
+        try:
+            yield instance
+        finally:
+            instance.close()
+
+    @asynccontextmanager
+    async def achild(self, overrides: Mapping[Any, Any]) -> AsyncIterator[_ManagerInstance]:
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to create child before dm start")
+        instance = self._instance.child(overrides)
+        try:
+            yield instance
+        finally:
+            await instance.aclose()
+
+    def session(self, name: LiteralString) -> SessionContext:
+        return SessionContext(name)
+
+    def load(self, *interfaces: Any) -> None:
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to get instance before dm start")
+        self._instance.load(interfaces)
+
+    def get_register(self) -> Register:
+        if not self._started:
+            raise AutomnConfigurationError("Attempn to get instance before dm start")
+        return self._instance.get_register()
+
     def get_property(self, name) -> Any:
         if name in self._instance.properties:
             return self._instance.properties[name]
@@ -0,0 +1,81 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+import os
+from threading import Lock
+from typing import Callable, Type
+import warnings
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from autumn.core.register import Component
+
+# Upper bounds of latency buckets in seconds, the last bucket is unbounded
+BUCKETS = (1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 2e-3, 5e-3, 1e-2, float("inf"))
+
+
+@dataclass
+class ResolutionMetrics:
+    scope: str
+    calls: int = 0
+    # Cache hits and misses are counted for singletons only
+    hits: int = 0
+    misses: int = 0
+    seconds: float = 0.0
+    histogram: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+
+
+# Called with the component class, its scope, whether the singleton was
+# cached and the resolution time of every sampled resolution
+Sink = Callable[[Type, str, bool | None, float], None]
+
+
+class _Metrics:
+    # Only a sample of resolutions is recorded, counters of a component have
+    # to be divided by the sample rate to estimate the real numbers.
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.sink: Sink | None = None
+        self._lock = Lock()
+        self._components: dict[str, "Component"] = {}
+        self._metrics: dict[str, ResolutionMetrics] = {}
+
+    def record(self, component: "Component", hit: bool | None, seconds: float) -> None:
+        with self._lock:
+            metrics = self._metrics.get(component.id)
+            if metrics is None:
+                metrics = self._metrics[component.id] = ResolutionMetrics(scope=component.scope)
+                self._components[component.id] = component
+            metrics.calls += 1
+            if hit is not None:
+                if hit:
+                    metrics.hits += 1
+                else:
+                    metrics.misses += 1
+            metrics.seconds += seconds
+            metrics.histogram[bisect_left(BUCKETS, seconds)] += 1
+        if self.sink is not None:
+            # A failing sink must not fail the resolution it reports
+            try:
+                self.sink(component.cls, component.scope, hit, seconds)
+            except Exception as error:
+                warnings.warn(f"Metrics sink failed: {error!r}", RuntimeWarning)
+
+    def report(self) -> dict[Type, ResolutionMetrics]:
+        with self._lock:
+            return {self._components[id].cls: ResolutionMetrics(scope=m.scope, calls=m.calls, hits=m.hits,
+                                                                misses=m.misses, seconds=m.seconds,
+                                                                histogram=m.histogram[:])
+                    for id, m in self._metrics.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._metrics = {}
+
+    def after_fork(self) -> None:
+        # The lock could be held by a thread of the parent process
+        self._lock = Lock()
+
+metrics = _Metrics()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=metrics.after_fork)
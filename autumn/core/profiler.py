@@ -0,0 +1,100 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+import os
+from threading import Lock
+from time import perf_counter
+from typing import Any, Type
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from autumn.core.register import Component
+
+
+@dataclass
+class ComponentProfile:
+    parsing: float = 0.0
+    check: float = 0.0
+    construction: float = 0.0
+    resolution: float = 0.0
+    calls: int = 0
+
+
+class _Frame:
+    __slots__ = ("component", "children")
+
+    def __init__(self, component: "Component") -> None:
+        self.component = component
+        self.children = 0.0
+
+
+class _Profiler:
+    # Construction is the time a resolution spent outside of nested
+    # resolutions, which are counted as dependency resolution of the
+    # component that requested them.
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = Lock()
+        self._components: dict[str, "Component"] = {}
+        self._profiles: dict[str, ComponentProfile] = {}
+        self._stacks: dict[tuple[str, ...], float] = {}
+        self._frames: ContextVar[tuple[_Frame, ...]] = ContextVar("frames", default=())
+
+    def _get_profile(self, component: "Component") -> ComponentProfile:
+        profile = self._profiles.get(component.id)
+        if profile is None:
+            profile = self._profiles[component.id] = ComponentProfile()
+            self._components[component.id] = component
+        return profile
+
+    def record(self, component: "Component", phase: str, seconds: float) -> None:
+        with self._lock:
+            profile = self._get_profile(component)
+            setattr(profile, phase, getattr(profile, phase) + seconds)
+
+    def enter(self, component: "Component") -> Any:
+        frames = self._frames.get()
+        return self._frames.set(frames + (_Frame(component), )), perf_counter()
+
+    def exit(self, state: Any) -> None:
+        token, started = state
+        elapsed = perf_counter() - started
+        frames = self._frames.get()
+        self._frames.reset(token)
+        frame = frames[-1]
+        if len(frames) > 1:
+            frames[-2].children += elapsed
+        construction = max(elapsed - frame.children, 0.0)
+        stack = tuple(f.component.id for f in frames)
+        with self._lock:
+            profile = self._get_profile(frame.component)
+            profile.calls += 1
+            profile.construction += construction
+            profile.resolution += elapsed - construction
+            self._stacks[stack] = self._stacks.get(stack, 0.0) + construction
+
+    def report(self) -> dict[Type, ComponentProfile]:
+        with self._lock:
+            return {self._components[id].cls: ComponentProfile(**vars(profile))
+                    for id, profile in self._profiles.items()}
+
+    def export_folded(self) -> str:
+        # Folded stacks with microseconds of construction time, the format
+        # accepted by flamegraph.pl and speedscope
+        with self._lock:
+            names = {id: c.cls.__qualname__ for id, c in self._components.items()}
+            stacks = list(self._stacks.items())
+        return "\n".join(f"{';'.join(names[id] for id in stack)} {round(seconds * 1e6)}"
+                         for stack, seconds in stacks)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles = {}
+            self._stacks = {}
+
+    def after_fork(self) -> None:
+        # The lock could be held by a thread of the parent process
+        self._lock = Lock()
+
+profiler = _Profiler()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=profiler.after_fork)
@@ -1,11 +1,20 @@
-from dataclasses import dataclass, field
+import asyncio
+from collections import ChainMap, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, replace
 from enum import Enum
+from functools import partial
 import inspect
-from typing import Iterable, Mapping, Type, TypeVar, overload, Any
+from typing import AbstractSet, AsyncIterator, Awaitable, Callable, Iterable, Iterator, Mapping, Sequence, Type, TypeVar, overload, Any
+from threading import RLock
+from time import perf_counter
 from uuid import uuid4
-from autumn.core.scope import PROTOTYPE, SESSION, SINGLETON, BaseCustomScope, get_instance
-from autumn.exceptions import AutomnComponentNotFound, AutomnConfigurationError, AutomnAmbiguousDependency
-from autumn.helpers.type_hints import extract_from_hint, Annotated, Collection, Optional, Particular
+import warnings
+from autumn.core.profiler import profiler
+from autumn.core.scope import PROTOTYPE, SESSION, SINGLETON, BaseCustomScope, PoolMetrics, ResolutionPlan, adestroy, aget_instance, destroy, draft_storage, get_instance, lazy_resolver, Provider, _CustomScope, _LazyProxy, _Pool, _SingletonCollection, get_pool_size, _InstanceScope, _SessionScope, _SingletonScope, _get_scope, _MISSING
+from autumn.exceptions import AutomnCircularDependency, AutomnComponentNotFound, AutomnConfigurationError, AutomnAmbiguousDependency, AutomnPropertyNotSet
+from autumn.helpers.graph import run_in_order, strongly_connected_components
+from autumn.helpers.type_hints import extract_from_hint, memoized, Annotated, Collection, Generic, Optional, Particular
 
 
 @dataclass
@@ -13,6 +22,13 @@ class _Dependency:
     interface: Any
     collection: Type | None = None
     optional: bool = False
+    lazy: bool = False
+    provider: bool = False
+
+    @property
+    def deferred(self) -> bool:
+        # Resolved after the instance is built, if at all
+        return self.lazy or self.provider
 
 
 @dataclass
@@ -24,9 +40,10 @@ class _Property:
 class InjectableType(Enum):
     property = "p"
     component = "c"
+    lazy = "l"
 
 
-@dataclass
+@dataclass(frozen=True)
 class InjectableDependency:
     type: InjectableType
     args: tuple[Any]
@@ -39,13 +56,35 @@ class Component:
     cls: Type
     interface: Any | None
     profiles: tuple[str] = ()
-    dependencies: dict[str, _Dependency] = field(default_factory=dict)
-    properties: dict[str, _Property] = field(default_factory=dict)
-
-
+    # Annotations are described on decoration, and parsed into dependencies
+    # and properties when a started register needs the component, both
+    # fields are None until then
+    hints: tuple[tuple[str, Any], ...] = ()
+    dependencies: dict[str, _Dependency] | None = None
+    properties: dict[str, _Property] | None = None
+    post_construct: tuple[str, ...] = ()
+    asynchronous: bool = False
+    pre_destroy: tuple[str, ...] = ()
+    asynchronous_destroy: bool = False
+    order: int = 0
+    # cls is a function called with the dependencies as arguments
+    factory: bool = False
+    # Instances can be inherited by forked processes
+    fork_safe: bool = True
+
+
+POST_CONSTRUCT_MARKER = "__autumn_post_construct__"
+PRE_DESTROY_MARKER = "__autumn_pre_destroy__"
+
+
+@memoized
 def dependency_descrition(original_type_hint: Any) -> (Any, Any):
     type_hint = extract_from_hint(original_type_hint)
     match type_hint:
+        case Annotated(Generic(Particular(p), (Collection(ct, Particular(a)),)), (Particular(b),)) if p is Provider:
+            return (Generic(Provider, (Collection(ct, a),)), b)
+        case Annotated(Generic(Particular(p), (Particular(a),)), (Particular(b),)) if p is Provider:
+            return (Generic(Provider, (a,)), b)
         case Annotated(Optional(Particular(a)), (Particular(b),)):
             return (Optional(a), b)
         case Annotated(Collection(ct, Particular(a)), (Particular(b),)):
@@ -74,41 +113,113 @@ def create_component(
     interface: Any | None,
     profiles: tuple[str, ...] = (),
     scope: str,
+    order: int = 0,
+    fork_safe: bool = True,
         cls: Type) -> Component:
+    hints = describe_annotations(cls)
+    post_construct = {}
+    pre_destroy = {}
+    for klass in reversed(cls.__mro__):
+        for name, value in vars(klass).items():
+            if getattr(value, POST_CONSTRUCT_MARKER, False):
+                post_construct[name] = value
+            if getattr(value, PRE_DESTROY_MARKER, False):
+                pre_destroy[name] = value
+
+    return Component(id=str(uuid4()),
+                     scope=scope,
+                     cls=cls,
+                     interface=interface,
+                     profiles=profiles,
+                     hints=hints,
+                     post_construct=tuple(post_construct),
+                     asynchronous=any(inspect.iscoroutinefunction(m) for m in post_construct.values()),
+                     pre_destroy=tuple(pre_destroy),
+                     asynchronous_destroy=any(inspect.iscoroutinefunction(m) for m in pre_destroy.values()),
+                     order=order,
+                     fork_safe=fork_safe)
+
+
+def create_factory(
+    *,
+    interface: Any,
+    profiles: tuple[str, ...] = (),
+    scope: str,
+    order: int = 0,
+    pre_destroy: tuple[str, ...] = (),
+    fork_safe: bool = True,
+        func: Callable) -> Component:
+    # Destroy hooks are known in advance only for factories returning a class,
+    # others are checked when destroyed
+    returned = func.__annotations__.get("return")
+    asynchronous_destroy = isinstance(returned, type) and any(
+        inspect.iscoroutinefunction(getattr(returned, method, None)) for method in pre_destroy)
+    return Component(id=str(uuid4()),
+                     scope=scope,
+                     cls=func,
+                     interface=interface,
+                     profiles=profiles,
+                     hints=describe_annotations(func),
+                     asynchronous=inspect.iscoroutinefunction(func),
+                     pre_destroy=pre_destroy,
+                     asynchronous_destroy=asynchronous_destroy,
+                     order=order,
+                     factory=True,
+                     fork_safe=fork_safe)
+
+
+def describe_annotations(cls: Type | Callable) -> tuple[tuple[str, Any], ...]:
+    # Invalid annotations are reported on decoration, even for components
+    # outside the active profiles
+    return tuple((name, dependency_descrition(original_type_hint))
+                 for name, original_type_hint in cls.__annotations__.items() if name != "return")
+
+
+def parse_component(component: Component) -> None:
+    if component.dependencies is not None:
+        return
+    started = perf_counter()
     dependencies = {}
     properties = {}
-    for name, original_type_hint in cls.__annotations__.items():
-        type_hint = dependency_descrition(original_type_hint)
+    for name, type_hint in component.hints:
         match type_hint:
-            case (Optional(t), InjectableDependency(InjectableType.component)):
+            case (Generic(p, (Collection(ct, t),)), InjectableDependency(InjectableType.component)) if p is Provider:
+                dependency = _Dependency(interface=t,
+                                         collection=ct,
+                                         provider=True)
+                dependencies[name] = dependency
+            case (Generic(p, (t,)), InjectableDependency(InjectableType.component)) if p is Provider:
+                dependency = _Dependency(interface=t,
+                                         provider=True)
+                dependencies[name] = dependency
+            case (Optional(t), InjectableDependency(InjectableType.component | InjectableType.lazy as kind)):
                 dependency = _Dependency(interface=t,
                                          collection=None,
-                                         optional=True)
+                                         optional=True,
+                                         lazy=kind is InjectableType.lazy)
                 dependencies[name] = dependency
-            case (Collection(ct, t), InjectableDependency(InjectableType.component)):
+            case (Collection(ct, t), InjectableDependency(InjectableType.component | InjectableType.lazy as kind)):
                 dependency = _Dependency(interface=t,
                                          collection=ct,
-                                         optional=False)
+                                         optional=False,
+                                         lazy=kind is InjectableType.lazy)
                 dependencies[name] = dependency
             case (Optional(), InjectableDependency(InjectableType.property, (n,))):
                 property = _Property(name=n, optional=True)
                 properties[name] = property
-            case (t, InjectableDependency(InjectableType.component)):
+            case (t, InjectableDependency(InjectableType.component | InjectableType.lazy as kind)):
                 dependency = _Dependency(interface=t,
                                          collection=None,
-                                         optional=False)
+                                         optional=False,
+                                         lazy=kind is InjectableType.lazy)
                 dependencies[name] = dependency
             case (_, InjectableDependency(InjectableType.property, (n,))):
                 property = _Property(name=n, optional=False)
                 properties[name] = property
-
-    return Component(id=str(uuid4()),
-                     scope=scope,
-                     cls=cls,
-                     interface=interface,
-                     profiles=profiles,
-                     dependencies=dependencies,
-                     properties=properties)
+    component.properties = properties
+    component.dependencies = dependencies
+    if profiler.enabled:
+        profiler.record(component, "parsing", perf_counter() - started)
 
 
 _T = TypeVar("_T")
@@ -121,8 +232,30 @@ class Register:
     def __init__(self) -> None:
         self._components: dict[Any, list[Component]] = {}
         self._scopes: dict[Any, list[Component]] = {}
-
-    def _get_id(self, interface: Type) -> int:
+        self._plans: dict[str, ResolutionPlan] = {}
+        # The same module can be imported under different names, which gives
+        # different interface objects for one declaration. Such objects are
+        # mapped to the interface the components were registered with.
+        self._interfaces: dict[str, Any] = {}
+        self._aliases: dict[Any, Sequence[Component]] = {}
+        # Registered components by their file key, used to restore snapshots
+        self._keys: dict[str, Component] = {}
+        # Collections made of singletons only, they are dropped on stop
+        self._collections: list[_SingletonCollection] = []
+        self._instances: dict[Any, _SingletonCollection | None] = {}
+        self._pools: dict[str, _Pool] = {}
+        self._singletons = _SingletonScope()
+        self._custom_scopes: list[_CustomScope] = []
+        self._graph: dict[str, dict[str, Sequence[Component]]] = {}
+        self._dependents: dict[str, list[str]] | None = None
+        self._groups: list[list[str]] = []
+        self.cycles: list[list[tuple[Component, str]]] = []
+        self._properties: Mapping[str, Any] = {}
+        # Plans shared with the base register, their singletons are cached
+        # by the base register
+        self._inherited: set[str] = set()
+
+    def _get_id(self, interface: Type) -> str:
         file = inspect.getfile(interface)
         return f"{file}:{interface.__name__}"
 
@@ -134,6 +267,7 @@ class Register:
         if component_id in _registered_components:
             return
         _registered_components.add(component_id)
+        self._keys[component_id] = component
 
         if component.scope == SESSION:
             component.scope = SINGLETON
@@ -141,60 +275,506 @@ class Register:
             self._scopes.setdefault(key, []).append(component)
         else:
             interface = component.interface or component.cls
-            key = self._get_id(interface)
-            self._components.setdefault(key, []).append(component)
+            interface = self._interfaces.setdefault(self._get_id(interface), interface)
+            self._components.setdefault(interface, []).append(component)
+            self._aliases.clear()
 
-    def check(self, properties: Iterable[str]) -> None:
+    def check(self, properties: Iterable[str], base: "Register | None" = None) -> None:
+        # Dependencies of every component are looked up once, the resulting
+        # adjacency lists are reused by compile
         properties = set(properties)
-        for _, components in self._components.items():
-            for component in components:
-                for field_name, dependency in component.dependencies.items():
-                    registered_dependencies = self.get_compnonents(
-                        dependency.interface)
-                    if not registered_dependencies:
-                        if not dependency.optional:
-                            raise AutomnComponentNotFound("Unsatisfied dependency found for "
-                                                          f"component {component.cls} for field `{field_name}` but the "
-                                                          "dependency is not optional")
-                        else:
-                            continue
-                    for registered_dependency in registered_dependencies:
-                        if registered_dependency.scope not in (SINGLETON, PROTOTYPE):
-                            raise AutomnConfigurationError("Custom scope dependencies are not "
-                                                           "permitted as class dependencies, always "
-                                                           "inject them via methonds")
-                    if len(registered_dependencies) > 1 and dependency.collection is None:
-                        raise AutomnAmbiguousDependency("Ambiguous dependencies found "
-                                                        f"for component {component.cls} for field `{field_name}`, "
-                                                        "more than one candidates found but the dependency is not a collection")
-                for property_name, property in component.properties.items():
-                    if property.name not in properties:
-                        if not property.optional:
-                            raise AutomnComponentNotFound("Unsatisfied dependency found for "
-                                                          f"component {component.cls} for field `{property_name}`, "
-                                                          "property value was not provided but the dependency is not optional")
-        for _, components in self._scopes.items():
-            if len(components) > 1:
+        components: dict[str, Component] = {}
+        graph: dict[str, dict[str, Sequence[Component]]] = {}
+        for registered in (self._components, self._scopes):
+            for interface_components in registered.values():
+                for component in interface_components:
+                    components[component.id] = component
+                    parse_component(component)
+                    # Components of the base register with the same candidates
+                    # for every dependency were already checked
+                    edges = base._graph.get(component.id) if base is not None else None
+                    if edges is not None and all(self.get_compnonents(d.interface) == edges[name]
+                                                 for name, d in component.dependencies.items()):
+                        graph[component.id] = edges
+                    elif profiler.enabled:
+                        started = perf_counter()
+                        graph[component.id] = self._check_component(component, properties)
+                        profiler.record(component, "check", perf_counter() - started)
+                    else:
+                        graph[component.id] = self._check_component(component, properties)
+        for _, scope_components in self._scopes.items():
+            if len(scope_components) > 1:
                 raise AutomnAmbiguousDependency(
-                    f"More than one scope found for name {components[0].interface}")
-
-    def get_instances(self, interface: _T, properties: Mapping[str, Any]) -> list[_T]:
-        components = self.get_compnonents(interface)
-        return [get_instance(self, component, properties) for component in components]
+                    f"More than one scope found for name {scope_components[0].interface}")
+
+        # Lazy and provided dependencies are resolved after the instance is
+        # built, they cannot form cycles and do not order construction
+        adjacency = {id: [target.id for name, targets in edges.items()
+                          if not components[id].dependencies[name].deferred for target in targets]
+                     for id, edges in graph.items()}
+        self._graph = graph
+        self._dependents = None
+        self._groups = strongly_connected_components(components, adjacency.__getitem__)
+        # Cycles are resolved at runtime through drafts, so they are
+        # reported but not rejected
+        self.cycles = []
+        for group in self._groups:
+            if len(group) > 1 or group[0] in adjacency[group[0]]:
+                cycle = _find_cycle(group, components, graph)
+                if any(components[id].factory for id in group):
+                    raise AutomnConfigurationError(f"Factories cannot be part of a dependency cycle: "
+                                                   f"{_format_cycle(cycle)}")
+                self.cycles.append(cycle)
+        self._report_cycles()
+
+    def _report_cycles(self) -> None:
+        for cycle in self.cycles:
+            warnings.warn(f"Circular dependency found: {_format_cycle(cycle)}",
+                          AutomnCircularDependency, stacklevel=3)
+
+    def _check_component(self, component: Component,
+                         properties: set[str]) -> dict[str, Sequence[Component]]:
+        edges = {}
+        for field_name, dependency in component.dependencies.items():
+            registered_dependencies = self.get_compnonents(
+                dependency.interface)
+            edges[field_name] = registered_dependencies
+            if not registered_dependencies:
+                if not dependency.optional:
+                    raise AutomnComponentNotFound("Unsatisfied dependency found for "
+                                                  f"component {component.cls} for field `{field_name}` but the "
+                                                  "dependency is not optional")
+                else:
+                    continue
+            for registered_dependency in registered_dependencies:
+                if registered_dependency.scope not in (SINGLETON, PROTOTYPE):
+                    raise AutomnConfigurationError("Custom scope dependencies are not "
+                                                   "permitted as class dependencies, always "
+                                                   "inject them via methonds")
+            if len(registered_dependencies) > 1 and dependency.collection is None:
+                raise AutomnAmbiguousDependency("Ambiguous dependencies found "
+                                                f"for component {component.cls} for field `{field_name}`, "
+                                                "more than one candidates found but the dependency is not a collection")
+        if component.factory:
+            for name, parameter in inspect.signature(component.cls).parameters.items():
+                if (parameter.default is parameter.empty
+                        and name not in component.dependencies and name not in component.properties):
+                    raise AutomnConfigurationError(f"Parameter `{name}` of factory {component.cls} "
+                                                   "is neither injectable nor has a default value")
+        for property_name, property in component.properties.items():
+            if property.name not in properties:
+                if not property.optional:
+                    raise AutomnComponentNotFound("Unsatisfied dependency found for "
+                                                  f"component {component.cls} for field `{property_name}`, "
+                                                  "property value was not provided but the dependency is not optional")
+        return edges
+
+    def _get_dependents(self) -> dict[str, list[str]]:
+        # Components by the components they depend on, lazy and provided
+        # dependencies included
+        if self._dependents is None:
+            dependents: dict[str, list[str]] = {}
+            for id, edges in self._graph.items():
+                for targets in edges.values():
+                    for target in targets:
+                        dependents.setdefault(target.id, []).append(id)
+            self._dependents = dependents
+        return self._dependents
+
+    def _get_reusable(self, properties: Mapping[str, Any], base: "Register") -> set[str]:
+        # Plans of the base register stay valid for components whose own
+        # edges and property values did not change, as well as those of
+        # every component they depend on
+        dependents = self._get_dependents()
+        queue = []
+        for registered in (self._components, self._scopes):
+            for components in registered.values():
+                for component in components:
+                    if (self._graph[component.id] is not base._graph.get(component.id)
+                            or component.id not in base._plans
+                            or (component.scope not in (SINGLETON, PROTOTYPE)
+                                and get_pool_size(component.scope) is None)
+                            or any(properties.get(p.name, _MISSING) is not base._properties.get(p.name, _MISSING)
+                                   for p in component.properties.values())):
+                        queue.append(component.id)
+        changed = set(queue)
+        while queue:
+            for id in dependents.get(queue.pop(), ()):
+                if id not in changed:
+                    changed.add(id)
+                    queue.append(id)
+        return self._graph.keys() - changed
+
+    def compile(self, properties: Mapping[str, Any], base: "Register | None" = None) -> None:
+        plans: dict[str, ResolutionPlan] = {}
+        scopes: dict[str, _CustomScope | _SessionScope] = {}
+        self._properties = properties
+        if base is not None:
+            self._inherited = self._get_reusable(properties, base)
+
+        def create_plan(component: Component) -> ResolutionPlan:
+            if component.id in self._inherited:
+                plan = plans[component.id] = base._plans[component.id]
+                return plan
+            fields = {}
+            for name, property in component.properties.items():
+                if property.name in properties:
+                    fields[name] = properties[property.name]
+                elif property.optional:
+                    fields[name] = None
+                else:
+                    raise AutomnPropertyNotSet(f"Component {component.cls} cannot be built, "
+                                               f"property `{property.name}` wasn't configured")
+            for name in component.dependencies:
+                fields[name] = None
+            plan = ResolutionPlan(component=component,
+                                  scope=_get_scope(component, scopes, self._singletons),
+                                  fields=fields)
+            plans[component.id] = plan
+            return plan
+
+        for name, components in self._scopes.items():
+            scopes[name] = _CustomScope(name, create_plan(components[0]))
+        for components in self._components.values():
+            for component in components:
+                create_plan(component)
+        self._custom_scopes = [scope for scope in scopes.values() if isinstance(scope, _CustomScope)]
+
+        self._plans = plans
+        self._bind(plan for plan in plans.values() if plan.component.id not in self._inherited)
+
+        for plan in plans.values():
+            size = get_pool_size(plan.component.scope)
+            if size is not None:
+                self._pools[plan.component.id] = _Pool(plan, *size)
+
+        self._create_locks()
+
+    def _bind(self, plans: Iterable[ResolutionPlan]) -> None:
+        deferred = []
+        for plan in plans:
+            dependencies = []
+            for name, dependency in plan.component.dependencies.items():
+                dependency_plans = tuple(self._plans[c.id] for c in self._graph[plan.component.id][name])
+                if dependency.deferred:
+                    deferred.append((plan, name, dependency, dependency_plans))
+                else:
+                    cached = None
+                    if dependency.collection is not None and _is_cacheable(dependency_plans):
+                        cached = _SingletonCollection(dependency_plans)
+                        self._collections.append(cached)
+                    dependencies.append((name, dependency.collection, dependency_plans, cached))
+            object.__setattr__(plan, "dependencies", tuple(dependencies))
+
+        # Resolvers of lazy and provided dependencies are bound once every
+        # plan knows its own dependencies
+        for plan, name, dependency, dependency_plans in deferred:
+            if dependency.provider:
+                plan.fields[name] = Provider(dependency.collection, dependency_plans)
+            elif dependency_plans or dependency.collection is not None:
+                resolver = lazy_resolver(dependency.collection, dependency_plans)
+                object.__setattr__(plan, "lazy", plan.lazy + ((name, resolver), ))
+
+    def child(self, overrides: Mapping[Any, Any]) -> "Register":
+        # Components depending on an overridden interface get plans of their
+        # own, cached in the child if they are singletons. Everything else is
+        # resolved with the plans and caches of this register.
+        child = Register()
+        child._components = self._components
+        child._scopes = self._scopes
+        child._interfaces = self._interfaces
+        child._aliases = self._aliases
+        child._graph = self._graph
+        child._dependents = self._get_dependents()
+        child._pools = self._pools
+        child._properties = self._properties
+        plans: dict[str, ResolutionPlan] = {}
+        for interface, instance in overrides.items():
+            component = self.get_compnonent(interface)
+            plans[component.id] = ResolutionPlan(component=component, scope=_InstanceScope(instance), fields={})
+        # Components of a custom scope are built by the scope component, so
+        # they are affected whenever it is
+        scope_ids = {components[0].id: name for name, components in self._scopes.items()}
+        queue = list(plans)
+        affected: dict[str, None] = {}
+        while queue:
+            id = queue.pop()
+            dependents = child._dependents.get(id, ())
+            if id in scope_ids:
+                dependents = [*dependents, *(c.id for components in self._components.values()
+                                             for c in components if c.scope == scope_ids[id])]
+            for id in dependents:
+                if id not in plans and id not in affected:
+                    affected[id] = None
+                    queue.append(id)
+
+        # Members of a cycle have to share a lock, a child builds rarely
+        # enough to use one for all
+        lock = RLock()
+        names = {scope_ids[id] for id in affected if id in scope_ids}
+        scoped = []
+        for id in affected:
+            plan = self._plans[id]
+            if plan.component.scope == SINGLETON:
+                plan = replace(plan, scope=_get_scope(plan.component, {}, child._singletons), lock=lock)
+            elif plan.component.scope in names:
+                scoped.append(id)
+                continue
+            plans[id] = replace(plan, fields=dict(plan.fields), dependencies=(), lazy=())
+        scopes = {name: _CustomScope(name, plans[id]) for id, name in scope_ids.items() if name in names}
+        for id in scoped:
+            plan = self._plans[id]
+            plans[id] = replace(plan, scope=_get_scope(plan.component, scopes, child._singletons),
+                                fields=dict(plan.fields), dependencies=(), lazy=())
+        child._custom_scopes = list(scopes.values())
+        child._plans = ChainMap(plans, self._plans)
+        child._bind(plans[id] for id in affected)
+        return child
+
+    def close(self) -> None:
+        # Destroys singletons of a child, the latest built first
+        instances = self._get_child_singletons()
+        for component, instance in instances:
+            if component.asynchronous_destroy:
+                raise AutomnConfigurationError(f"Component {component.cls} has an asynchronous "
+                                               "destroy hook, the child must be closed with aclose")
+        for component, instance in instances:
+            destroy(component, instance)
+
+    async def aclose(self) -> None:
+        for component, instance in self._get_child_singletons():
+            await adestroy(component, instance)
+
+    def _get_child_singletons(self) -> list[tuple[Component, Any]]:
+        return [(self._plans[id].component, instance) for id, instance in reversed(self._singletons.pop_all())]
+
+    def _create_locks(self) -> None:
+        # Singletons are built under a lock, members of a dependency cycle
+        # share it, so that threads cannot lock the cycle in different order
+        for group in self._groups:
+            if group[0] in self._inherited:
+                continue
+            lock = RLock()
+            for plan in (self._plans[id] for id in group):
+                if plan.component.scope == SINGLETON:
+                    object.__setattr__(plan, "lock", lock)
+
+    def _get_groups(self) -> tuple[list[list[ResolutionPlan]], list[set[int]]]:
+        groups = [[self._plans[id] for id in group] for group in self._groups]
+        group_index = {plan: i for i, group in enumerate(groups) for plan in group}
+        dependencies = []
+        for i, group in enumerate(groups):
+            group_dependencies = {group_index[d] for plan in group for d in _plan_dependencies(plan)}
+            group_dependencies.discard(i)
+            dependencies.append(group_dependencies)
+        return groups, dependencies
+
+    def warm_up(self, max_workers: int | None = None,
+                exclude: AbstractSet[str] = frozenset()) -> dict[Type, float]:
+        groups, dependencies = self._get_groups()
+
+        def build(group: list[ResolutionPlan]) -> dict[Type, float]:
+            times = {}
+            for plan in group:
+                if plan.component.scope == SINGLETON and plan.component.id not in exclude:
+                    started = perf_counter()
+                    get_instance(plan)
+                    times[plan.component.cls] = perf_counter() - started
+            return times
+
+        # Groups depending on an asynchronous component cannot be built here,
+        # they are left for the first aget_instance
+        blocked: list[bool] = []
+        tasks = []
+        for group, group_dependencies in zip(groups, dependencies):
+            blocked.append(any(plan.component.asynchronous for plan in group)
+                           or any(blocked[d] for d in group_dependencies))
+            if blocked[-1] or not any(p.component.scope == SINGLETON for p in group):
+                tasks.append(None)
+            else:
+                tasks.append(partial(build, group))
+
+        report: dict[Type, float] = {}
+        for times in run_in_order(tasks, dependencies, max_workers):
+            report.update(times or {})
+        return report
+
+    def _get_fork_unsafe(self) -> set[str]:
+        # Unsafe components and every component which can hold one of
+        # their instances
+        dependents = self._get_dependents()
+        queue = [id for id, plan in self._plans.items() if not plan.component.fork_safe]
+        unsafe = set(queue)
+        while queue:
+            for id in dependents.get(queue.pop(), ()):
+                if id not in unsafe:
+                    unsafe.add(id)
+                    queue.append(id)
+        return unsafe
+
+    def prepare_fork(self, max_workers: int | None = None) -> dict[Type, float]:
+        return self.warm_up(max_workers, exclude=self._get_fork_unsafe())
+
+    def after_fork(self) -> None:
+        # Locks could be held by threads of the parent process, which do not
+        # exist in the child. Unsafe instances are dropped without destroy
+        # hooks, their resources still belong to the parent.
+        unsafe = self._get_fork_unsafe()
+        self._singletons.after_fork(unsafe)
+        for scope in self._custom_scopes:
+            scope.after_fork(unsafe)
+        self._create_locks()
+        self._clear_collections()
+        for id, pool in self._pools.items():
+            pool.after_fork(keep=id not in unsafe)
+        self.fill_pools()
+
+    def _take_pools(self, base: "Register") -> None:
+        # Pools of unchanged components keep their instances and metrics,
+        # the others are closed
+        for id, pool in base._pools.items():
+            if id in self._pools and id in self._inherited:
+                self._pools[id] = pool
+            else:
+                for instance in pool.close():
+                    if not pool.plan.component.asynchronous_destroy:
+                        destroy(pool.plan.component, instance)
+
+    def fill_pools(self) -> None:
+        # Pools of asynchronous components are filled on demand
+        for pool in self._pools.values():
+            if not pool.plan.component.asynchronous:
+                pool.fill()
+
+    def _get_pool(self, interface: Any) -> _Pool:
+        component = self.get_compnonent(interface)
+        pool = self._pools.get(component.id)
+        if pool is None:
+            raise AutomnConfigurationError(f"Component {component.cls} is not pooled")
+        return pool
+
+    @contextmanager
+    def borrow(self, interface: _T) -> Iterator[_T]:
+        pool = self._get_pool(interface)
+        instance = pool.acquire()
+        try:
+            yield instance
+        finally:
+            pool.release(instance)
+
+    @asynccontextmanager
+    async def aborrow(self, interface: _T) -> AsyncIterator[_T]:
+        pool = self._get_pool(interface)
+        instance = await pool.aacquire()
+        try:
+            yield instance
+        finally:
+            pool.release(instance)
+
+    def get_pool_metrics(self) -> dict[Type, PoolMetrics]:
+        return {pool.plan.component.cls: replace(pool.metrics) for pool in self._pools.values()}
+
+    def _get_built_singletons(self, group: list[ResolutionPlan]) -> list[tuple[Component, Any]]:
+        built = []
+        for plan in group:
+            if plan.component.scope == SINGLETON:
+                instance = self._singletons.pop(plan.component.id)
+                if instance is not _MISSING:
+                    built.append((plan.component, instance))
+        return built
+
+    def _get_teardown_order(self) -> tuple[list[list[ResolutionPlan]], list[list[int]]]:
+        # Every group is destroyed after all the groups depending on it
+        groups, dependencies = self._get_groups()
+        dependents: list[list[int]] = [[] for _ in groups]
+        for i, group_dependencies in enumerate(dependencies):
+            for dependency in group_dependencies:
+                dependents[dependency].append(i)
+        return groups, dependents
+
+    def stop(self, max_workers: int | None = None) -> None:
+        groups, dependents = self._get_teardown_order()
+        for group in groups:
+            for plan in group:
+                if (plan.component.scope == SINGLETON 
+                        and plan.component.asynchronous_destroy
+                        and self._singletons.get_cached(plan.component.id) is not _MISSING):
+                    raise AutomnConfigurationError(f"Component {plan.component.cls} has an asynchronous "
+                                                   "destroy hook, dm must be stopped with astop")
+
+        for pool in self._pools.values():
+            if pool.plan.component.asynchronous_destroy and pool.metrics.size:
+                raise AutomnConfigurationError(f"Component {pool.plan.component.cls} has an asynchronous "
+                                               "destroy hook, dm must be stopped with astop")
+
+        def teardown(group: list[ResolutionPlan]) -> None:
+            for component, instance in self._get_built_singletons(group):
+                destroy(component, instance)
+
+        # Pooled components cannot be dependencies, so they go first
+        for pool in self._pools.values():
+            for instance in pool.close():
+                destroy(pool.plan.component, instance)
+        run_in_order([partial(teardown, group) for group in groups], dependents, max_workers)
+        self._clear_collections()
+
+    async def astop(self) -> None:
+        groups, dependents = self._get_teardown_order()
+        tasks: dict[int, asyncio.Future] = {}
+
+        async def teardown(group: list[ResolutionPlan], waits: list[asyncio.Future]) -> None:
+            await asyncio.gather(*waits)
+            for component, instance in self._get_built_singletons(group):
+                await adestroy(component, instance)
+
+        for pool in self._pools.values():
+            for instance in pool.close():
+                await adestroy(pool.plan.component, instance)
+        for i in reversed(range(len(groups))):
+            tasks[i] = asyncio.ensure_future(teardown(groups[i], [tasks[j] for j in dependents[i]]))
+        await asyncio.gather(*tasks.values())
+        self._clear_collections()
+
+    def _clear_collections(self) -> None:
+        for collection in self._collections:
+            collection.instances = None
+
+    def _get_cached_instances(self, interface: Any) -> _SingletonCollection | None:
+        cached = self._instances.get(interface, _MISSING)
+        if cached is _MISSING:
+            plans = tuple(self._plans[c.id] for c in self.get_compnonents(interface))
+            cached = None
+            if _is_cacheable(plans):
+                cached = _SingletonCollection(plans)
+                self._collections.append(cached)
+            self._instances[interface] = cached
+        return cached
+
+    def get_instances(self, interface: _T) -> list[_T]:
+        cached = self._get_cached_instances(interface)
+        if cached is None:
+            components = self.get_compnonents(interface)
+            return [get_instance(self._plans[component.id]) for component in components]
+        return list(_get_collection(cached))
+
+    async def aget_instances(self, interface: _T) -> list[_T]:
+        cached = self._get_cached_instances(interface)
+        if cached is None:
+            components = self.get_compnonents(interface)
+            return list(await asyncio.gather(*(aget_instance(self._plans[component.id])
+                                               for component in components)))
+        return list(await _aget_collection(cached))
 
     @overload
-    def get_instance(self, interface: _T,
-                     properties: Mapping[str, Any]) -> _T:
+    def get_instance(self, interface: _T) -> _T:
         ...
 
     @overload
     def get_instance(self, interface: _T,
-                     properties: Mapping[str, Any],
                      optional: bool) -> _T | None:
         ...
 
     def get_instance(self, interface: _T,
-                     properties: Mapping[str, Any],
                      optional: bool = False):
         try:
             component = self.get_compnonent(interface)
@@ -202,14 +782,105 @@ class Register:
             if optional:
                 return None
             raise
-        return get_instance(self, component, properties)
+        return get_instance(self._plans[component.id])
+
+    async def aget_instance(self, interface: _T,
+                            optional: bool = False) -> _T | None:
+        try:
+            component = self.get_compnonent(interface)
+        except AutomnComponentNotFound:
+            if optional:
+                return None
+            raise
+        return await aget_instance(self._plans[component.id])
 
-    def get_scope(self, name: str, properties: Mapping[str, Any]) -> BaseCustomScope:
+    def _get_resolver_plans(self, interface: Any,
+                            optional: bool,
+                            collection: Type | None) -> tuple[ResolutionPlan, ...]:
+        if collection is not None:
+            components = self.get_compnonents(interface)
+        else:
+            try:
+                components = (self.get_compnonent(interface), )
+            except AutomnComponentNotFound:
+                if not optional:
+                    raise
+                components = ()
+        return tuple(self._plans[c.id] for c in components)
+
+    def get_resolver(self, interface: Any,
+                     optional: bool = False,
+                     collection: Type | None = None) -> Callable[[], Any]:
+        # Nothing is built until a resolver is called, and singletons are
+        # looked up in their cache on every call, so a bound resolver sees
+        # instances dropped after binding, e.g. by after_fork
+        plans = self._get_resolver_plans(interface, optional, collection)
+        if collection is not None:
+            cached = self._get_cached_instances(interface)
+            if cached is not None:
+                return lambda: collection(_get_collection(cached))
+            return lambda: collection([get_instance(plan) for plan in plans])
+        if not plans:
+            return lambda: None
+        plan = plans[0]
+        if type(plan.scope) is not _SingletonScope:
+            return partial(get_instance, plan)
+        get_cached, component_id = plan.scope.get_cached, plan.component.id
+
+        def resolve_singleton():
+            instance = get_cached(component_id)
+            if instance is _MISSING:
+                instance = get_instance(plan)
+            return instance
+        return resolve_singleton
+
+    async def aget_resolver(self, interface: Any,
+                            optional: bool = False,
+                            collection: Type | None = None) -> Callable[[], Awaitable[Any]]:
+        plans = self._get_resolver_plans(interface, optional, collection)
+        if collection is not None:
+            cached = self._get_cached_instances(interface)
+            if cached is not None:
+                async def resolve_singletons():
+                    return collection(await _aget_collection(cached))
+                return resolve_singletons
+            async def resolve_collection():
+                return collection(await asyncio.gather(*(aget_instance(plan) for plan in plans)))
+            return resolve_collection
+        if not plans:
+            async def resolve_none():
+                return None
+            return resolve_none
+        plan = plans[0]
+        if type(plan.scope) is not _SingletonScope:
+            return partial(aget_instance, plan)
+        get_cached, component_id = plan.scope.get_cached, plan.component.id
+
+        async def resolve_singleton():
+            instance = get_cached(component_id)
+            if instance is _MISSING:
+                instance = await aget_instance(plan)
+            return instance
+        return resolve_singleton
+
+    def get_lazy_resolver(self, interface: Any,
+                          optional: bool = False,
+                          collection: Type | None = None) -> Callable[[], Any]:
+        # Every call returns a proxy resolving the dependency on first use
+        plans = self._get_resolver_plans(interface, optional, collection)
+        if not plans and collection is None:
+            return lambda: None
+        resolve = lazy_resolver(collection, plans)
+        return lambda: _LazyProxy(resolve)
+
+    def get_provider(self, interface: Any, collection: Type | None = None) -> Provider:
+        return Provider(collection, self._get_resolver_plans(interface, False, collection))
+
+    def get_scope(self, name: str) -> BaseCustomScope:
         scopes = self._scopes.get(name)
         if scopes is None:
             raise AutomnComponentNotFound(f"Scope `{name}` not found")
-        scope_component = scopes[0]
-        scope_instance = get_instance(self, scope_component, properties)
+        scope_instance = get_instance(self._plans[scopes[0].id])
         return scope_instance
 
     def get_compnonent(self, interface: Any) -> Component:
@@ -222,15 +893,98 @@ class Register:
                 f"More than one component registered for interface {interface}")
         return components[0]
 
-    def get_compnonents(self, interface: Any) -> list[Component]:
-        key = self._get_id(interface)
-        components = self._components.get(key, [])[:]
+    def get_compnonents(self, interface: Any) -> Sequence[Component]:
+        components = self._components.get(interface)
+        if components is None:
+            components = self._aliases.get(interface)
+            if components is None:
+                components = self._get_aliased_compnonents(interface)
         return components
 
+    def _get_aliased_compnonents(self, interface: Any) -> Sequence[Component]:
+        try:
+            key = self._get_id(interface)
+        except TypeError:
+            key = None
+        components = self._components.get(self._interfaces.get(key), ())
+        self._aliases[interface] = components
+        return components
+
+
+def _is_cacheable(plans: tuple[ResolutionPlan, ...]) -> bool:
+    return bool(plans) and all(plan.component.scope == SINGLETON for plan in plans)
 
-def create_register_instance(profiles: Iterable[str], properties: Iterable[str]) -> Register:
+
+def _get_collection(cached: _SingletonCollection) -> tuple:
+    instances = cached.instances
+    if instances is None:
+        token = draft_storage.open()
+        try:
+            instances = cached.get()
+        finally:
+            draft_storage.close(token)
+    elif cached.metered:
+        cached.record_hits()
+    return instances
+
+
+async def _aget_collection(cached: _SingletonCollection) -> tuple:
+    instances = cached.instances
+    if instances is None:
+        token = draft_storage.open()
+        try:
+            instances = await cached.aget()
+        finally:
+            draft_storage.close(token)
+    elif cached.metered:
+        cached.record_hits()
+    return instances
+
+
+def _plan_dependencies(plan: ResolutionPlan) -> Iterable[ResolutionPlan]:
+    for _, _, dependency_plans, _ in plan.dependencies:
+        yield from dependency_plans
+
+
+def _format_cycle(cycle: list[tuple[Component, str]]) -> str:
+    path = " -> ".join(f"{c.cls.__qualname__}.{name}" for c, name in cycle)
+    return f"{path} -> {cycle[0][0].cls.__qualname__}"
+
+
+def _find_cycle(group: list[str],
+                components: dict[str, Component],
+                graph: dict[str, dict[str, Sequence[Component]]]) -> list[tuple[Component, str]]:
+    # Shortest path from the first visited member of a strongly connected
+    # group back to itself, every step is a component and the field leading on
+    members = set(group)
+    start = group[-1]
+    previous: dict[str, tuple[str, str]] = {}
+    queue = deque([start])
+    while start not in previous:
+        id = queue.popleft()
+        for name, targets in graph[id].items():
+            if components[id].dependencies[name].deferred:
+                continue
+            for target in targets:
+                if target.id in members and target.id not in previous:
+                    previous[target.id] = (id, name)
+                    queue.append(target.id)
+    path = []
+    id = start
+    while True:
+        id, name = previous[id]
+        path.append((components[id], name))
+        if id == start:
+            break
+    return path[::-1]
+
+
+def create_register_instance(profiles: Iterable[str], properties: Mapping[str, Any],
+                             base: Register | None = None, share_singletons: bool = False) -> Register:
     profiles = set(profiles)
     register_instance = Register()
+    if share_singletons:
+        register_instance._singletons = base._singletons
 
     def filter_components(components_dict):
         result_dict = {}
@@ -241,10 +995,14 @@ def create_register_instance(profiles: Iterable[str], properties: Iterable[str])
                         break
                 else:
                     result_dict.setdefault(t, []).append(component)
-        return result_dict
+        return {t: tuple(sorted(components, key=lambda c: c.order)) for t, components in result_dict.items()}
     register_instance._components = filter_components(register._components)
     register_instance._scopes = filter_components(register._scopes)
-    register_instance.check(properties)
+    register_instance._interfaces = register._interfaces.copy()
+    register_instance.check(properties, base)
+    register_instance.compile(properties, base)
+    if share_singletons:
+        register_instance._take_pools(base)
     return register_instance
 
 
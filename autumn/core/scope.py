@@ -1,145 +1,898 @@
 from abc import ABC, abstractmethod
-from typing import Any, Generic, Mapping, TypeVar
-from autumn.exceptions import AutomnConfigurationError, AutomnPropertyNotSet, AutomnSessionNotEntered
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+from functools import partial
+import inspect
+from random import random
+from threading import Lock
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Collection, Generic, Hashable, Iterable, Mapping, MutableMapping, Type, TypeVar
+import weakref
+from types import MappingProxyType
+from autumn.core.metrics import metrics
+from autumn.core.profiler import profiler
+from autumn.exceptions import AutomnComponentNotFound, AutomnConfigurationError, AutomnSessionNotEntered
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
-    from autumn.core.register import Component, Register
+    from threading import RLock
+    from autumn.core.register import Component
 
 
 class _DraftStorage:
+    # Drafts are kept per thread and per asyncio task. Every resolution
+    # opens its own drafts and restores the enclosing ones when closed.
 
     def __init__(self):
-        self._cache: dict[str, Any] = {}
+        self._cache: ContextVar[dict[str, Any] | None] = ContextVar("drafts", default=None)
 
-    def __enter__(self) -> None:
-        self._cache = {}
+    def open(self) -> Token:
+        return self._cache.set(None)
 
-    def __exit__(self, type, value, traceback) -> None:
-        self._cache = {}
+    def close(self, token: Token) -> None:
+        self._cache.reset(token)
 
     def get(self, component_id: str) -> Any | None:
-        return self._cache.get(component_id)
+        cache = self._cache.get()
+        if cache is None:
+            return None
+        return cache.get(component_id)
     
     def set(self, component_id: str, draft: Any) -> None:
-        self._cache[component_id] = draft
+        cache = self._cache.get()
+        if cache is None:
+            cache = {}
+            self._cache.set(cache)
+        cache[component_id] = draft
+
+    def isolate(self) -> None:
+        # Dependencies resolved concurrently see the drafts of their
+        # ancestors, but not the ones of each other
+        cache = self._cache.get()
+        if cache is not None:
+            self._cache.set(dict(cache))
 
 draft_storage = _DraftStorage()
 
 
+_T = TypeVar("_T")
+
+_MISSING = object()
+
 SINGLETON = "singleton"
 PROTOTYPE = "prototype"
 SESSION = "session"
+_SESSION_PREFIX = "session:"
+
+
+def session_scope(name: str) -> str:
+    return f"{_SESSION_PREFIX}{name}"
+
+
+POOLED = "pooled"
+_POOLED_PREFIX = "pooled:"
+_POOL_MAX_SIZE = 8
+
+
+def pooled_scope(max_size: int = _POOL_MAX_SIZE, min_size: int = 0) -> str:
+    return f"{_POOLED_PREFIX}{min_size}:{max_size}"
+
+
+def get_pool_size(scope: str) -> tuple[int, int] | None:
+    if scope == POOLED:
+        return 0, _POOL_MAX_SIZE
+    if not scope.startswith(_POOLED_PREFIX):
+        return None
+    try:
+        min_size, max_size = map(int, scope.removeprefix(_POOLED_PREFIX).split(":"))
+    except ValueError:
+        raise AutomnConfigurationError(f"Wrong pool scope `{scope}`") from None
+    if not 0 <= min_size <= max_size or max_size < 1:
+        raise AutomnConfigurationError(f"Wrong pool size in scope `{scope}`, sizes must "
+                                       "satisfy 0 <= min_size <= max_size and max_size >= 1")
+    return min_size, max_size
+
 
 class BaseCustomScope(ABC):
     
     @abstractmethod 
-    def get_instance(self) -> Any:
+    def get_instance(self) -> Any | Awaitable[Any]:
         ...
 
+    def cached(self, session: Hashable, factory: Callable[[], _T]) -> _T:
+        # Returns the same instance for a session until it is released, sessions
+        # which can be weakly referenced are released when garbage collected
+        instances = self._get_instances(session)
+        instance = instances.get(session, _MISSING)
+        if instance is _MISSING:
+            instance = instances.setdefault(session, factory())
+        return instance
+
+    def release(self, session: Hashable) -> None:
+        self._get_instances(session).pop(session, None)
+
+    def _get_instances(self, session: Hashable) -> MutableMapping[Hashable, Any]:
+        try:
+            weakref.ref(session)
+        except TypeError:
+            return self.__dict__.setdefault("_autumn_instances", {})
+        return self.__dict__.setdefault("_autumn_weak_instances", weakref.WeakKeyDictionary())
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class ResolutionPlan:
+    component: "Component"
+    scope: Any
+    fields: Mapping[str, Any]
+    dependencies: tuple[tuple[str, Type | None, tuple["ResolutionPlan", ...], "_SingletonCollection | None"], ...] = ()
+    lock: "RLock | None" = None
+    lazy: tuple[tuple[str, Callable[[], Any]], ...] = ()
+
+
+class _SingletonCollection:
+    # Members of a collection made of singletons only. They are kept once
+    # all of them are published, a member that is still a draft of a cycle
+    # under construction is resolved again next time.
+    __slots__ = ("plans", "instances", "metered")
+
+    def __init__(self, plans: tuple[ResolutionPlan, ...]) -> None:
+        self.plans = plans
+        self.instances: tuple | None = None
+        self.metered = tuple(plan for plan in plans if isinstance(plan.scope, _MeteredScope))
+
+    def record_hits(self) -> None:
+        # Kept members do not go through their metered scopes, so their
+        # hits are sampled here
+        for plan in self.metered:
+            if random() < metrics.sample_rate:
+                metrics.record(plan.component, True, 0.0)
+
+    def _publish(self, instances: tuple) -> tuple:
+        if all(plan.scope.get_cached(plan.component.id) is instance
+               for plan, instance in zip(self.plans, instances)):
+            self.instances = instances
+        return instances
+
+    def get(self) -> tuple:
+        instances = self.instances
+        if instances is None:
+            instances = self._publish(tuple([_resolve_dependency(plan) for plan in self.plans]))
+        elif self.metered:
+            self.record_hits()
+        return instances
+
+    async def aget(self) -> tuple:
+        instances = self.instances
+        if instances is None:
+            resolutions = (_aresolve_isolated(_aresolve_dependency(plan)) for plan in self.plans)
+            instances = self._publish(tuple(await asyncio.gather(*resolutions)))
+        elif self.metered:
+            self.record_hits()
+        return instances
+
+
+class _LazyProxy:
+    # Stands in for a dependency until it is used for the first time, the
+    # dependency is resolved then and every operation is delegated to it
+    __slots__ = ("_autumn_resolve", "_autumn_instance")
+
+    def __init__(self, resolve: Callable[[], Any]) -> None:
+        object.__setattr__(self, "_autumn_resolve", resolve)
+        object.__setattr__(self, "_autumn_instance", _MISSING)
+
+    def _autumn_get(self) -> Any:
+        instance = self._autumn_instance
+        if instance is _MISSING:
+            instance = self._autumn_resolve()
+            object.__setattr__(self, "_autumn_instance", instance)
+        return instance
+
+    @property
+    def __class__(self) -> Type:
+        return type(self._autumn_get())
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._autumn_get(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._autumn_get(), name, value)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self._autumn_get()(*args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._autumn_get())
+
+    def __len__(self) -> int:
+        return len(self._autumn_get())
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._autumn_get()[key]
+
+    def __bool__(self) -> bool:
+        return bool(self._autumn_get())
+
+    def __repr__(self) -> str:
+        if self._autumn_instance is _MISSING:
+            return "<unresolved lazy dependency>"
+        return repr(self._autumn_instance)
+
+
+class Provider(Generic[_T]):
+    # Injected with Annotated[Provider[T], Injectable] or, to build every
+    # candidate, Annotated[Provider[list[T]], Injectable]. Every call
+    # resolves the component through its plan.
+    __slots__ = ("_collection", "_plans", "_resolve")
+
+    def __init__(self, collection: Type | None, plans: tuple[ResolutionPlan, ...]) -> None:
+        self._collection = collection
+        self._plans = plans
+        self._resolve = lazy_resolver(collection, plans)
+
+    def __call__(self) -> _T:
+        return self._resolve()
+
+    def many(self, n: int) -> list[_T]:
+        resolve = self._resolve
+        return [resolve() for _ in range(n)]
+
+    async def aget(self) -> _T:
+        if self._collection is not None:
+            return self._collection(await asyncio.gather(*(aget_instance(plan) for plan in self._plans)))
+        return await aget_instance(self._plans[0])
+
+    async def amany(self, n: int) -> list[_T]:
+        return list(await asyncio.gather(*(self.aget() for _ in range(n))))
+
+
+def lazy_resolver(collection: Type | None, plans: tuple[ResolutionPlan, ...]) -> Callable[[], Any]:
+    if collection is not None:
+        return lambda: collection([get_instance(plan) for plan in plans])
+    plan = plans[0]
+    if not plan.dependencies and plan.component.scope in (SINGLETON, PROTOTYPE):
+        # Nothing else is resolved while building a leaf, so it needs no
+        # drafts of its own
+        return partial(plan.scope.get_instance, plan)
+    return partial(get_instance, plan)
+
+
+# Singleton groups whose asynchronous build was started by the current task
+# or by one of its parents, used to let a dependency cycle build itself
+# instead of waiting for its own completion.
+_building: ContextVar[frozenset] = ContextVar("building", default=frozenset())
+
+
 class _SingletonScope:
 
     def __init__(self):
         self._cache: dict[str, Any] = {}
+        self._pending: dict[Any, asyncio.Future] = {}
 
-    def get_instance(self, 
-                     register: "Register", 
-                     component: "Component", 
-                     properties: Mapping[str, Any]) -> Any:
-        if component.id in self._cache:
-            return self._cache[component.id]
-        instance = _create_instance(register, component, properties)
-        self._cache[component.id] = instance
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        component_id = plan.component.id
+        instance = self._cache.get(component_id, _MISSING)
+        if instance is not _MISSING:
+            return instance
+        with plan.lock:
+            instance = self._cache.get(component_id, _MISSING)
+            if instance is _MISSING:
+                instance = _create_instance(plan)
+                instance = self._cache.setdefault(component_id, instance)
         return instance
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        component_id = plan.component.id
+        instance = self._cache.get(component_id, _MISSING)
+        while instance is _MISSING:
+            pending = self._pending.get(plan.lock)
+            if (pending is None 
+                    or plan.lock in _building.get()
+                    or pending.get_loop() is not asyncio.get_running_loop()):
+                return await self._abuild(plan)
+            await asyncio.wait([pending])
+            instance = self._cache.get(component_id, _MISSING)
+        return instance
+
+    async def _abuild(self, plan: ResolutionPlan) -> Any:
+        owner = plan.lock not in _building.get()
+        if owner:
+            pending = asyncio.get_running_loop().create_future()
+            self._pending[plan.lock] = pending
+            token = _building.set(_building.get() | {plan.lock})
+        try:
+            instance = await _acreate_instance(plan)
+            return self._cache.setdefault(plan.component.id, instance)
+        finally:
+            if owner:
+                _building.reset(token)
+                if self._pending.get(plan.lock) is pending:
+                    del self._pending[plan.lock]
+                pending.set_result(None)
     
-    def clear_cache(self) -> None:
-        self._cache = {}
+    def get_cached(self, component_id: str) -> Any:
+        return self._cache.get(component_id, _MISSING)
+
+    def pop(self, component_id: str) -> Any:
+        return self._cache.pop(component_id, _MISSING)
+    
+    def pop_all(self) -> list[tuple[str, Any]]:
+        # In the order the instances were built
+        cache, self._cache = self._cache, {}
+        return list(cache.items())
+
+    def after_fork(self, component_ids: Iterable[str]) -> None:
+        # Builds pending in the parent process never finish in the child
+        self._pending = {}
+        for component_id in component_ids:
+            self._cache.pop(component_id, None)
 
 class _PrototypeScope:
     
-    def get_instance(self, 
-                     register: "Register", 
-                     component: "Component", 
-                     properties: Mapping[str, Any]) -> Any:
-        return _create_instance(register, component, properties)
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        instance = _create_instance(plan)
+        if plan.component.pre_destroy:
+            _track_in_session(plan.component, instance)
+        return instance
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        instance = await _acreate_instance(plan)
+        if plan.component.pre_destroy:
+            _track_in_session(plan.component, instance)
+        return instance
+
+
+@dataclass
+class PoolMetrics:
+    size: int = 0
+    idle: int = 0
+    hits: int = 0
+    creations: int = 0
+    waits: int = 0
+
+
+class _Pool:
+    # Instances of a pooled component, borrowed one at a time. When the pool
+    # is exhausted borrowers wait in order; threads wait on concurrent
+    # futures and tasks on futures of their loops.
+
+    def __init__(self, plan: ResolutionPlan, min_size: int, max_size: int) -> None:
+        self.plan = plan
+        self.min_size = min_size
+        self.max_size = max_size
+        self.metrics = PoolMetrics()
+        self._lock = Lock()
+        self._idle: deque = deque()
+        self._waiters: deque = deque()
+        self._closed = False
+
+    def _checkout(self, create_waiter: Callable[[], Any]) -> tuple[Any, Any]:
+        # An idle instance, _MISSING when the caller has to create one, or
+        # a waiter to wait on
+        with self._lock:
+            if self._closed:
+                raise AutomnConfigurationError(f"Pool of {self.plan.component.cls} is closed")
+            if self._idle:
+                self.metrics.hits += 1
+                self.metrics.idle -= 1
+                return self._idle.pop(), None
+            if self.metrics.size < self.max_size:
+                self.metrics.size += 1
+                self.metrics.creations += 1
+                return _MISSING, None
+            self.metrics.waits += 1
+            waiter = create_waiter()
+            self._waiters.append(waiter)
+            return _MISSING, waiter
+
+    def _deliver(self, value: Any) -> bool:
+        # Called under the lock, _MISSING lets a waiter create an instance
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if isinstance(waiter, Future):
+                waiter.set_result(value)
+                return True
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(self._resolve, waiter, value)
+                return True
+        return False
+
+    def _resolve(self, waiter: asyncio.Future, value: Any) -> None:
+        # The waiter could have been cancelled after the value was sent
+        if not waiter.done():
+            waiter.set_result(value)
+        elif value is _MISSING:
+            self._discard()
+        else:
+            self.release(value)
+
+    def _discard(self) -> None:
+        with self._lock:
+            if not self._deliver(_MISSING):
+                self.metrics.size -= 1
+
+    def _create(self) -> Any:
+        token = draft_storage.open()
+        try:
+            return _create_instance(self.plan)
+        except BaseException:
+            self._discard()
+            raise
+        finally:
+            draft_storage.close(token)
+
+    async def _acreate(self) -> Any:
+        token = draft_storage.open()
+        try:
+            return await _acreate_instance(self.plan)
+        except BaseException:
+            self._discard()
+            raise
+        finally:
+            draft_storage.close(token)
+
+    def acquire(self) -> Any:
+        instance, waiter = self._checkout(Future)
+        if waiter is not None:
+            instance = waiter.result()
+        if instance is _MISSING:
+            return self._create()
+        return instance
+
+    async def aacquire(self) -> Any:
+        instance, waiter = self._checkout(asyncio.get_running_loop().create_future)
+        if waiter is not None:
+            instance = await waiter
+        if instance is _MISSING:
+            return await self._acreate()
+        return instance
+
+    def release(self, instance: Any) -> None:
+        with self._lock:
+            if not self._closed:
+                if not self._deliver(instance):
+                    self._idle.append(instance)
+                    self.metrics.idle += 1
+                return
+            self.metrics.size -= 1
+        destroy(self.plan.component, instance)
+
+    def fill(self) -> None:
+        while True:
+            with self._lock:
+                if self.metrics.size >= self.min_size:
+                    return
+                self.metrics.size += 1
+                self.metrics.creations += 1
+            self.release(self._create())
+
+    def after_fork(self, keep: bool) -> None:
+        # Borrowers and the lock owner are threads of the parent process
+        self._lock = Lock()
+        self._waiters = deque()
+        if not keep:
+            self._idle = deque()
+        self.metrics = PoolMetrics(size=len(self._idle), idle=len(self._idle))
+
+    def close(self) -> list[Any]:
+        # Idle instances are returned to be destroyed, borrowed ones are
+        # destroyed when they are released
+        with self._lock:
+            self._closed = True
+            instances = list(self._idle)
+            self._idle.clear()
+            self.metrics.size -= len(instances)
+            self.metrics.idle = 0
+            return instances
+
+
+class _InstanceScope:
+    # Provides the instance a child register was given in place of a
+    # component
+
+    def __init__(self, instance: Any) -> None:
+        self._instance = instance
+
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        return self._instance
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        return self._instance
+
+    def get_cached(self, component_id: str) -> Any:
+        return self._instance
+
+
+class _PooledScope:
+
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        raise AutomnConfigurationError(f"Component {plan.component.cls} is pooled and "
+                                       "must be borrowed with dm.borrow")
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        self.get_instance(plan)
+
+
+class _CustomScope:
+    # Shared by all components of a scope within a register, the scope
+    # component is a singleton, so it is resolved once and kept here.
+
+    def __init__(self, name: str, scope_plan: ResolutionPlan | None) -> None:
+        self._name = name
+        self._scope_plan = scope_plan
+        self._scope: BaseCustomScope | None = None
+
+    def after_fork(self, component_ids: Collection[str]) -> None:
+        if self._scope_plan is not None and self._scope_plan.component.id in component_ids:
+            self._scope = None
+
+    def _get_scope(self) -> BaseCustomScope:
+        if self._scope_plan is None:
+            raise AutomnComponentNotFound(f"Scope `{self._name}` not found")
+        self._scope = _resolve_dependency(self._scope_plan)
+        return self._scope
+
+    async def _aget_scope(self) -> BaseCustomScope:
+        if self._scope_plan is None:
+            raise AutomnComponentNotFound(f"Scope `{self._name}` not found")
+        self._scope = await _aresolve_dependency(self._scope_plan)
+        return self._scope
+
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        scope = self._scope
+        if scope is None:
+            scope = self._get_scope()
+        instance = scope.get_instance()
+        if inspect.isawaitable(instance):
+            _discard(instance)
+            raise AutomnConfigurationError(f"Scope `{self._name}` is asynchronous, "
+                                           f"component {plan.component.cls} must be "
+                                           "resolved with aget_instance")
+        return instance
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        scope = self._scope
+        if scope is None:
+            scope = await self._aget_scope()
+        instance = scope.get_instance()
+        if inspect.isawaitable(instance):
+            instance = await instance
+        return instance
+
+
+class _Session:
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.instances: dict[str, Any] = {}
+        self.disposables: list[tuple["Component", Any]] = []
+
+    def dispose(self) -> None:
+        disposables, self.disposables, self.instances = self.disposables, [], {}
+        if any(component.asynchronous_destroy for component, _ in disposables):
+            raise AutomnConfigurationError(f"Session `{self.name}` holds components with "
+                                           "asynchronous destroy hooks and must be "
+                                           "entered with `async with`")
+        for component, instance in reversed(disposables):
+            destroy(component, instance)
+
+    async def adispose(self) -> None:
+        disposables, self.disposables, self.instances = self.disposables, [], {}
+        for component, instance in reversed(disposables):
+            await adestroy(component, instance)
+
+
+_sessions: ContextVar[Mapping[str, _Session]] = ContextVar("sessions", default=MappingProxyType({}))
+# The innermost entered session, prototypes with destroy hooks created
+# inside it are disposed together with it
+_active_session: ContextVar[_Session | None] = ContextVar("active_session", default=None)
+
+
+def _track_in_session(component: "Component", instance: Any) -> None:
+    session = _active_session.get()
+    if session is not None:
+        session.disposables.append((component, instance))
+
+
+class SessionContext:
+    # Entered sessions are visible to the current thread or task and to the
+    # tasks it starts, concurrent sessions with the same name do not interfere.
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._tokens: list[tuple[Token, Token, _Session]] = []
+
+    def __enter__(self) -> "SessionContext":
+        session = _Session(self._name)
+        sessions = _sessions.get()
+        token = _sessions.set(MappingProxyType({**sessions, self._name: session}))
+        active_token = _active_session.set(session)
+        self._tokens.append((token, active_token, session))
+        return self
+
+    def _leave(self) -> _Session:
+        token, active_token, session = self._tokens.pop()
+        _active_session.reset(active_token)
+        _sessions.reset(token)
+        return session
+
+    def __exit__(self, type, value, traceback) -> None:
+        self._leave().dispose()
+
+    async def __aenter__(self) -> "SessionContext":
+        return self.__enter__()
+
+    async def __aexit__(self, type, value, traceback) -> None:
+        await self._leave().adispose()
+
+
+class _SessionScope:
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def _get_session(self) -> _Session:
+        session = _sessions.get().get(self._name)
+        if session is None:
+            raise AutomnSessionNotEntered(f"Session `{self._name}` is not entered")
+        return session
+
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        session = self._get_session()
+        instance = session.instances.get(plan.component.id, _MISSING)
+        if instance is _MISSING:
+            instance = self._store(session, plan, _create_instance(plan))
+        return instance
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        session = self._get_session()
+        instance = session.instances.get(plan.component.id, _MISSING)
+        if instance is _MISSING:
+            instance = self._store(session, plan, await _acreate_instance(plan))
+        return instance
+
+    def _store(self, session: _Session, plan: ResolutionPlan, instance: Any) -> Any:
+        stored = session.instances.setdefault(plan.component.id, instance)
+        if stored is instance and plan.component.pre_destroy:
+            session.disposables.append((plan.component, instance))
+        return stored
+
+
+class _ProfiledScope:
+
+    def __init__(self, scope: Any) -> None:
+        self._scope = scope
+
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        state = profiler.enter(plan.component)
+        try:
+            return self._scope.get_instance(plan)
+        finally:
+            profiler.exit(state)
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        state = profiler.enter(plan.component)
+        try:
+            return await self._scope.aget_instance(plan)
+        finally:
+            profiler.exit(state)
+
+    def get_cached(self, component_id: str) -> Any:
+        return self._scope.get_cached(component_id)
+
+
+class _MeteredScope:
+    # Resolutions which are not sampled only pay for the call of the
+    # wrapped scope and a random number
+
+    def __init__(self, scope: Any) -> None:
+        self._scope = scope
+        self._get_instance = scope.get_instance
+
+    def _is_cached(self, plan: ResolutionPlan) -> bool | None:
+        if plan.component.scope != SINGLETON:
+            return None
+        return self._scope.get_cached(plan.component.id) is not _MISSING
+
+    def get_instance(self, plan: ResolutionPlan) -> Any:
+        if random() >= metrics.sample_rate:
+            return self._get_instance(plan)
+        hit = self._is_cached(plan)
+        started = perf_counter()
+        try:
+            return self._get_instance(plan)
+        finally:
+            metrics.record(plan.component, hit, perf_counter() - started)
+
+    async def aget_instance(self, plan: ResolutionPlan) -> Any:
+        if random() >= metrics.sample_rate:
+            return await self._scope.aget_instance(plan)
+        hit = self._is_cached(plan)
+        started = perf_counter()
+        try:
+            return await self._scope.aget_instance(plan)
+        finally:
+            metrics.record(plan.component, hit, perf_counter() - started)
+
+    def get_cached(self, component_id: str) -> Any:
+        return self._scope.get_cached(component_id)
 
 
-_singleton_scope = _SingletonScope()
 _prototype_scope = _PrototypeScope()
+_pooled_scope = _PooledScope()
+
+
+def _discard(awaitable: Awaitable) -> None:
+    if inspect.iscoroutine(awaitable):
+        awaitable.close()
 
+def _get_scope(component: "Component",
+               scopes: dict[str, _CustomScope | _SessionScope],
+               singletons: _SingletonScope) -> Any:
+    scope = _get_unprofiled_scope(component, scopes, singletons)
+    if profiler.enabled:
+        scope = _ProfiledScope(scope)
+    if metrics.enabled:
+        scope = _MeteredScope(scope)
+    return scope
 
-def _get_scope(component: "Component", 
-               register: "Register",
-               properties: Mapping[str, Any]) -> _SingletonScope | _PrototypeScope:
+def _get_unprofiled_scope(component: "Component",
+                          scopes: dict[str, _CustomScope | _SessionScope],
+                          singletons: _SingletonScope) -> _SingletonScope | _PrototypeScope | _CustomScope | _SessionScope:
     if component.scope == SINGLETON:
-        return _singleton_scope
+        return singletons
     elif component.scope == PROTOTYPE:
         return _prototype_scope
-    else:
-        scope = register.get_scope(component.scope, properties)
-        return scope
-
-def _resolve_dependency(register: "Register",
-                        component: "Component", 
-                        properties: Mapping[str, Any]) -> Any:
+    elif get_pool_size(component.scope) is not None:
+        return _pooled_scope
+    scope = scopes.get(component.scope)
+    if scope is None:
+        if component.scope.startswith(_SESSION_PREFIX):
+            scope = _SessionScope(component.scope.removeprefix(_SESSION_PREFIX))
+        else:
+            scope = _CustomScope(component.scope, None)
+        scopes[component.scope] = scope
+    return scope
 
-    draft_instance = draft_storage.get(component.id)
+def _resolve_dependency(plan: ResolutionPlan) -> Any:
+    draft_instance = draft_storage.get(plan.component.id)
     if draft_instance is None:
-        scope = _get_scope(component, register, properties)
-        if scope in (_singleton_scope, _prototype_scope):
-            instance = scope.get_instance(register, component, properties)
-        else:
-            instance = scope.get_instance()
-    else:
-        instance = draft_instance
-    return instance
+        return plan.scope.get_instance(plan)
+    return draft_instance
 
-def _create_instance(register: "Register",
-                     component: "Component", 
-                     properties: Mapping[str, Any]) -> Any:
-    fields = {}
+def _create_instance(plan: ResolutionPlan) -> Any:
+    component = plan.component
+    if component.asynchronous:
+        raise AutomnConfigurationError(f"Component {component.cls} has an asynchronous "
+                                       "initializer and must be resolved with aget_instance")
+    if component.factory:
+        return _call_factory(plan)
+    instance = component.cls(**plan.fields)
+    if plan.dependencies:
+        draft_storage.set(component.id, instance)
 
-    for name, property in component.properties.items():
-        if property.name in properties:
-            fields[name] = properties[property.name]
-        elif property.optional:
-            fields[name] = None
+    for name, collection, dependency_plans, cached in plan.dependencies:
+        if cached is not None:
+            value = collection(cached.get())
+        elif collection is not None:
+            value = collection([_resolve_dependency(p) for p in dependency_plans])
+        elif dependency_plans:
+            value = _resolve_dependency(dependency_plans[0])
         else:
-            raise AutomnPropertyNotSet(f"Component {component.cls} cannot be built, "
-                                        f"property `{property.name}` wasn't configured")
-    
-    
-    for name, dependency in component.dependencies.items():
-        fields[name] = None
+            continue
+        object.__setattr__(instance, name, value)
+    for name, resolve in plan.lazy:
+        object.__setattr__(instance, name, _LazyProxy(resolve))
 
-    instance = component.cls(**fields) 
-    draft_storage.set(component.id, instance)
-    
-    for name, dependency in component.dependencies.items():
-        if dependency.collection is None:
-            dependency_component = register.get_compnonent(dependency.interface)
-            dependency_instance = _resolve_dependency(register, dependency_component, properties)
-            object.__setattr__(instance, name, dependency_instance)
-        else:
-            dependency_components = register.get_compnonents(dependency.interface)
-            dependency_instances = []
-            for dependency_component in dependency_components:
-                dependency_instance = _resolve_dependency(register, dependency_component, properties)
-                dependency_instances.append(dependency_instance)
-            collection = dependency.collection(dependency_instances) 
-            object.__setattr__(instance, name, collection)
+    for method in component.post_construct:
+        getattr(instance, method)()
     
     return instance
 
-def get_instance(register: "Register",
-                component: "Component", 
-                properties: Mapping[str, Any]) -> Any:
-    with draft_storage:
-        scope = _get_scope(component, register, properties)
-        if scope in (_singleton_scope, _prototype_scope):
-            instance = scope.get_instance(register, component, properties)
+def _call_factory(plan: ResolutionPlan) -> Any:
+    # Factories get their dependencies as arguments, so unlike classes
+    # they cannot be part of a dependency cycle
+    arguments = dict(plan.fields)
+    for name, collection, dependency_plans, cached in plan.dependencies:
+        if cached is not None:
+            arguments[name] = collection(cached.get())
+        elif collection is not None:
+            arguments[name] = collection([_resolve_dependency(p) for p in dependency_plans])
+        elif dependency_plans:
+            arguments[name] = _resolve_dependency(dependency_plans[0])
+    for name, resolve in plan.lazy:
+        arguments[name] = _LazyProxy(resolve)
+    return plan.component.cls(**arguments)
+
+async def _aresolve_dependency(plan: ResolutionPlan) -> Any:
+    draft_instance = draft_storage.get(plan.component.id)
+    if draft_instance is None:
+        return await plan.scope.aget_instance(plan)
+    return draft_instance
+
+async def _aresolve_isolated(resolution: Awaitable[Any]) -> Any:
+    # Runs as a task of gather, so the drafts are copied for this task only
+    draft_storage.isolate()
+    return await resolution
+
+async def _aresolve_collection(collection: Type,
+                               plans: tuple[ResolutionPlan, ...],
+                               cached: _SingletonCollection | None) -> Any:
+    if cached is not None:
+        return collection(await cached.aget())
+    instances = await asyncio.gather(*(_aresolve_isolated(_aresolve_dependency(p)) for p in plans))
+    return collection(instances)
+
+async def _acreate_instance(plan: ResolutionPlan) -> Any:
+    component = plan.component
+    if not component.factory:
+        instance = component.cls(**plan.fields)
+        if plan.dependencies:
+            draft_storage.set(component.id, instance)
+
+    # Independent dependencies are resolved concurrently, so initialization
+    # takes as long as the slowest of them rather than their sum
+    names = []
+    resolutions = []
+    for name, collection, dependency_plans, cached in plan.dependencies:
+        if collection is not None:
+            resolutions.append(_aresolve_collection(collection, dependency_plans, cached))
+        elif dependency_plans:
+            resolutions.append(_aresolve_dependency(dependency_plans[0]))
         else:
-            instance = scope.get_instance()
+            continue
+        names.append(name)
+    if len(resolutions) == 1:
+        values = [await resolutions[0]]
+    else:
+        values = await asyncio.gather(*map(_aresolve_isolated, resolutions))
+    if component.factory:
+        arguments = dict(plan.fields)
+        arguments.update(zip(names, values))
+        for name, resolve in plan.lazy:
+            arguments[name] = _LazyProxy(resolve)
+        instance = component.cls(**arguments)
+        if inspect.isawaitable(instance):
+            instance = await instance
         return instance
-    
-def clear_caches():
-    _singleton_scope.clear_cache()
\ No newline at end of file
+
+    for name, value in zip(names, values):
+        object.__setattr__(instance, name, value)
+    for name, resolve in plan.lazy:
+        object.__setattr__(instance, name, _LazyProxy(resolve))
+
+    for method in component.post_construct:
+        result = getattr(instance, method)()
+        if inspect.isawaitable(result):
+            await result
+
+    return instance
+
+def destroy(component: "Component", instance: Any) -> None:
+    for method in component.pre_destroy:
+        result = getattr(instance, method)()
+        if inspect.isawaitable(result):
+            _discard(result)
+            raise AutomnConfigurationError(f"Destroy hook `{method}` of component {component.cls} "
+                                           "is asynchronous, it must be destroyed with astop or aclose")
+
+async def adestroy(component: "Component", instance: Any) -> None:
+    for method in component.pre_destroy:
+        result = getattr(instance, method)()
+        if inspect.isawaitable(result):
+            await result
+
+def get_instance(plan: ResolutionPlan) -> Any:
+    token = draft_storage.open()
+    try:
+        return plan.scope.get_instance(plan)
+    finally:
+        draft_storage.close(token)
+
+async def aget_instance(plan: ResolutionPlan) -> Any:
+    token = draft_storage.open()
+    try:
+        return await plan.scope.aget_instance(plan)
+    finally:
+        draft_storage.close(token)
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+import os
+import pickle
+import sys
+from typing import Any, Iterable, Mapping
+
+from autumn.core.register import Component, Register, _Dependency, _Property, register
+
+# Bumped whenever the layout of the snapshot changes
+_VERSION = 1
+
+
+@dataclass
+class _Snapshot:
+    fingerprint: str
+    components: list[tuple[str, tuple[str, ...]]]
+    scopes: list[tuple[str, tuple[str, ...]]]
+    parsed: dict[str, tuple[dict[str, _Dependency], dict[str, _Property]]]
+    graph: dict[str, dict[str, tuple[str, ...]]]
+    groups: list[list[str]]
+    cycles: list[list[tuple[str, str]]]
+
+
+def _interface_key(component: Component) -> str:
+    if isinstance(component.interface, str):
+        return component.interface
+    return register._get_id(component.interface or component.cls)
+
+
+def fingerprint(profiles: Iterable[str], properties: Iterable[str]) -> str:
+    # Annotations are parsed on decoration, so the registered components
+    # with their parsed hints describe the registry, including hints built
+    # from aliases declared in other modules
+    digest = sha256(f"{_VERSION}:{sys.version}".encode())
+    digest.update(repr((sorted(set(profiles)), sorted(properties))).encode())
+    for key, component in sorted(register._keys.items()):
+        digest.update(repr((key, _interface_key(component), component.scope, component.profiles,
+                            component.order, component.hints)).encode())
+    return digest.hexdigest()
+
+
+def save(path: str | Path, register_instance: Register, digest: str) -> bool:
+    keys = {component.id: key for key, component in register._keys.items()}
+
+    def dump(registered: Mapping[Any, tuple[Component, ...]]) -> list[tuple[str, tuple[str, ...]]]:
+        return [(_interface_key(components[0]), tuple(keys[c.id] for c in components))
+                for components in registered.values()]
+
+    parsed = {}
+    for registered in (register_instance._components, register_instance._scopes):
+        for components in registered.values():
+            for component in components:
+                parsed[keys[component.id]] = (component.dependencies, component.properties)
+    snapshot = _Snapshot(fingerprint=digest,
+                         components=dump(register_instance._components),
+                         scopes=dump(register_instance._scopes),
+                         parsed=parsed,
+                         graph={keys[id]: {name: tuple(keys[c.id] for c in targets)
+                                           for name, targets in edges.items()}
+                                for id, edges in register_instance._graph.items()},
+                         groups=[[keys[id] for id in group] for group in register_instance._groups],
+                         cycles=[[(keys[c.id], name) for c, name in cycle]
+                                 for cycle in register_instance.cycles])
+    try:
+        data = pickle.dumps(snapshot, pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        # Interfaces declared at runtime cannot be referenced from a file
+        return False
+    path = Path(path)
+    temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+    return True
+
+
+def load(path: str | Path, digest: str) -> Register | None:
+    # A missing, outdated or unreadable snapshot is not an error, the
+    # register is built from the declarations instead
+    try:
+        with open(path, "rb") as file:
+            snapshot = pickle.load(file)
+    except Exception:
+        return None
+    if not isinstance(snapshot, _Snapshot) or snapshot.fingerprint != digest:
+        return None
+    components = register._keys
+    register_instance = Register()
+    register_instance._interfaces = register._interfaces.copy()
+    try:
+        register_instance._components = {register._interfaces[interface]: tuple(components[k] for k in group)
+                                         for interface, group in snapshot.components}
+        register_instance._scopes = {name: tuple(components[k] for k in group)
+                                     for name, group in snapshot.scopes}
+        register_instance._graph = {components[key].id: {name: tuple(components[k] for k in targets)
+                                                         for name, targets in edges.items()}
+                                    for key, edges in snapshot.graph.items()}
+        register_instance._groups = [[components[key].id for key in group] for group in snapshot.groups]
+        register_instance.cycles = [[(components[key], name) for key, name in cycle]
+                                    for cycle in snapshot.cycles]
+    except KeyError:
+        return None
+    for key, (dependencies, properties) in snapshot.parsed.items():
+        component = components[key]
+        if component.dependencies is None:
+            component.properties = properties
+            component.dependencies = dependencies
+    register_instance._report_cycles()
+    return register_instance
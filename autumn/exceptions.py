@@ -15,4 +15,7 @@ class AutomnPropertyNotSet(Exception):
 
 
 class AutomnSessionNotEntered(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class AutomnCircularDependency(Warning):
+    pass
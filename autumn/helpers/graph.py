@@ -0,0 +1,89 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Hashable, Iterable, Sequence, TypeVar
+
+_N = TypeVar("_N", bound=Hashable)
+_R = TypeVar("_R")
+
+
+def strongly_connected_components(nodes: Iterable[_N],
+                                  successors: Callable[[_N], Iterable[_N]]) -> list[list[_N]]:
+    # Iterative Tarjan's algorithm, components are returned in reverse
+    # topological order: every component goes after the components it
+    # depends on.
+    index: dict[_N, int] = {}
+    lowlink: dict[_N, int] = {}
+    stack: list[_N] = []
+    on_stack: set[_N] = set()
+    result: list[list[_N]] = []
+
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors(root)))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(successors(child))))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member is node:
+                            break
+                    result.append(component)
+    return result
+
+
+def run_in_order(tasks: Sequence[Callable[[], _R] | None],
+                 dependencies: Sequence[Iterable[int]],
+                 max_workers: int | None = None) -> list[_R | None]:
+    # Runs every task on a thread pool as soon as the tasks it depends on
+    # are finished, so independent tasks run concurrently. Missing tasks
+    # are treated as finished immediately.
+    dependents: list[list[int]] = [[] for _ in tasks]
+    waiting: list[int] = []
+    for i, task_dependencies in enumerate(dependencies):
+        task_dependencies = set(task_dependencies)
+        for dependency in task_dependencies:
+            dependents[dependency].append(i)
+        waiting.append(len(task_dependencies))
+
+    results: list[_R | None] = [None] * len(tasks)
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures: dict[Future, int] = {}
+        ready = [i for i, count in enumerate(waiting) if count == 0]
+        while ready or futures:
+            for i in ready:
+                if tasks[i] is None:
+                    future = Future()
+                    future.set_result(None)
+                else:
+                    future = executor.submit(tasks[i])
+                futures[future] = i
+            ready = []
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures.pop(future)
+                results[i] = future.result()
+                for dependent in dependents[i]:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+    return results
@@ -1,33 +1,69 @@
 from dataclasses import dataclass
+from functools import wraps
 from types import NoneType, UnionType
 from typing import Any, Type, get_args, get_origin, Annotated as _Annotated
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Generic:
     origin: Any
     args: tuple[Any, ...]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Particular:
     origin: Type
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Optional:
     origin: Any
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Annotated:
     type: Any 
     args: tuple[Any, ...]
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Collection:
     collection_type: Type
     item_type: Any
 
 
 
+_CACHE_SIZE = 4096
+
+
+def _hint_key(type_hint: Any) -> Any:
+    # Hints of different kinds can compare equal, e.g. Optional[X] and
+    # X | None, so the key holds the kind of every nested argument
+    origin = get_origin(type_hint)
+    if origin is None:
+        return type(type_hint), type_hint
+    return type(type_hint), origin, tuple(_hint_key(a) for a in get_args(type_hint))
+
+
+def memoized(func):
+    # Parsed hints are immutable, so equal hints share one result. Hints
+    # with unhashable arguments are parsed every time.
+    cache: dict[Any, Any] = {}
+
+    @wraps(func)
+    def wrapper(type_hint: Any) -> Any:
+        try:
+            key = _hint_key(type_hint)
+            return cache[key]
+        except KeyError:
+            pass
+        except TypeError:
+            return func(type_hint)
+        result = func(type_hint)
+        if len(cache) < _CACHE_SIZE:
+            cache[key] = result
+        return result
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+
+@memoized
 def extract_from_hint(type_hint: Any) -> Generic | Particular | Optional | Annotated | Collection:
     origin_type = get_origin(type_hint)
     if not origin_type:
@@ -53,5 +89,3 @@ def extract_from_hint(type_hint: Any) -> Generic | Particular | Optional | Annot
     
     return Generic(origin=extract_from_hint(origin_type), 
                    args=tuple(extract_from_hint(i) for i in args))
-                              
-
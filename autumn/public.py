@@ -1,15 +1,16 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from functools import wraps
-from typing import Any, Type, dataclass_transform, LiteralString
+import inspect
+from typing import Any, Awaitable, Callable, Type, dataclass_transform, LiteralString
 from autumn.exceptions import AutomnConfigurationError
 
-from autumn.helpers.type_hints import Collection, Optional
+from autumn.helpers.type_hints import Collection, Generic, Optional
 from .core.register import dependency_descrition
 
-from .core.register import register, create_component, InjectableDependency, InjectableType
+from .core.register import Register, register, create_component, create_factory, InjectableDependency, InjectableType, POST_CONSTRUCT_MARKER, PRE_DESTROY_MARKER
 from .core.manager import dm
-from .core.scope import SINGLETON, PROTOTYPE, SESSION as __SESSION, BaseCustomScope
+from .core.scope import SINGLETON, PROTOTYPE, POOLED, SESSION as __SESSION, BaseCustomScope, Provider, pooled_scope, session_scope
 
 
 @dataclass_transform()
@@ -17,13 +18,21 @@ def component(interface: Any | None = None,
               *, 
               scope: str, 
               profiles: tuple[str, ...] = (),
-              frozen: bool = True):
+              frozen: bool = True,
+              order: int = 0,
+              fork_safe: bool = True):
+    # Collections of an interface list its components by ascending order,
+    # components with equal order in the order they were registered.
+    # Components which are not fork safe, e.g. holding sockets or threads,
+    # are rebuilt by dm.after_fork.
     if not isinstance(profiles, (list, tuple)):
         profiles = (profiles, )
     def decorator(cls):
         component = create_component(interface=interface,
                                      scope=scope,
                                      profiles=profiles,
+                                     order=order,
+                                     fork_safe=fork_safe,
                                      cls=cls)
 
         component_class = dataclass(cls,
@@ -38,51 +47,149 @@ def component(interface: Any | None = None,
     return decorator
 
 
+def factory(interface: Any | None = None,
+            *,
+            scope: str,
+            profiles: tuple[str, ...] = (),
+            order: int = 0,
+            pre_destroy: tuple[str, ...] = (),
+            fork_safe: bool = True):
+    # The function provides instances of the interface, its parameters are
+    # injected the same way as fields of components. The interface defaults
+    # to the return annotation.
+    if not isinstance(profiles, (list, tuple)):
+        profiles = (profiles, )
+    if not isinstance(pre_destroy, (list, tuple)):
+        pre_destroy = (pre_destroy, )
+    def decorator(func):
+        provided = interface
+        if provided is None:
+            provided = func.__annotations__.get("return")
+            if not isinstance(provided, type):
+                raise AutomnConfigurationError(f"Factory {func} must declare an interface "
+                                               "or return a class")
+        component = create_factory(interface=provided,
+                                   scope=scope,
+                                   profiles=profiles,
+                                   order=order,
+                                   pre_destroy=tuple(pre_destroy),
+                                   fork_safe=fork_safe,
+                                   func=func)
+        register.register_component(component)
+        return func
+    return decorator
+
+
 @dataclass
 class _Dependency:
     interface: Any
     collection: Type | None = None
     optional: bool = False
+    lazy: bool = False
+    provider: bool = False
+
+
+def _get_resolver(register_instance: Register, dependency: _Dependency) -> Callable[[], Any]:
+    if dependency.provider:
+        provider = register_instance.get_provider(dependency.interface, dependency.collection)
+        return lambda: provider
+    if dependency.lazy:
+        return register_instance.get_lazy_resolver(dependency.interface, dependency.optional, dependency.collection)
+    return register_instance.get_resolver(dependency.interface, dependency.optional, dependency.collection)
+
+
+async def _aget_resolver(register_instance: Register, dependency: _Dependency) -> Callable[[], Awaitable[Any]]:
+    if dependency.provider or dependency.lazy:
+        # Providers and lazy dependencies resolve nothing until they are used
+        resolve = _get_resolver(register_instance, dependency)
+
+        async def resolve_deferred():
+            return resolve()
+        return resolve_deferred
+    return await register_instance.aget_resolver(dependency.interface, dependency.optional, dependency.collection)
+
 
 def autowired_method(func):
     dependencies: dict[str, _Dependency] = {} 
     for name, original_type_hint in func.__annotations__.items():
         type_hint = dependency_descrition(original_type_hint)
         match type_hint:
-            case (Optional(t), InjectableDependency(InjectableType.component)):
+            case (Generic(p, (Collection(ct, t),)), InjectableDependency(InjectableType.component)) if p is Provider:
+                dependency = _Dependency(interface=t,
+                                        collection=ct,
+                                        provider=True)
+                dependencies[name] = dependency
+            case (Generic(p, (t,)), InjectableDependency(InjectableType.component)) if p is Provider:
                 dependency = _Dependency(interface=t,
-                                        optional=True)
+                                        provider=True)
                 dependencies[name] = dependency
-            case (Collection(ct, t), InjectableDependency(InjectableType.component)):
+            case (Optional(t), InjectableDependency(InjectableType.component | InjectableType.lazy as kind)):
                 dependency = _Dependency(interface=t,
-                                        collection=ct)
+                                        optional=True,
+                                        lazy=kind is InjectableType.lazy)
                 dependencies[name] = dependency
-            case (t, InjectableDependency(InjectableType.component)):
-                dependency = _Dependency(interface=t)
+            case (Collection(ct, t), InjectableDependency(InjectableType.component | InjectableType.lazy as kind)):
+                dependency = _Dependency(interface=t,
+                                        collection=ct,
+                                        lazy=kind is InjectableType.lazy)
+                dependencies[name] = dependency
+            case (t, InjectableDependency(InjectableType.component | InjectableType.lazy as kind)):
+                dependency = _Dependency(interface=t,
+                                        lazy=kind is InjectableType.lazy)
                 dependencies[name] = dependency
             case(_, InjectableDependency(InjectableType.property)):
                 raise AutomnConfigurationError(f"Injectable properties are not supported for"
                                                "autowared methods yet")
             
+    # Resolvers are bound to the register of the started dm on the first
+    # call and rebound only when dm is restarted or swapped
+    bound: tuple[Register | None, tuple[tuple[str, Callable], ...]] = (None, ())
+
+    if inspect.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_decorator(*args, **kwargs):
+            nonlocal bound
+            current, resolvers = bound
+            if current is not dm.get_register():
+                dm.load(*(d.interface for d in dependencies.values()))
+                current = dm.get_register()
+                resolvers = tuple([(name, await _aget_resolver(current, d)) for name, d in dependencies.items()])
+                bound = (current, resolvers)
+            for name, resolve in resolvers:
+                if name not in kwargs:
+                    kwargs[name] = await resolve()
+            return await func(*args, **kwargs)
+        return async_decorator
+            
     @wraps(func)
     def decorator(*args, **kwargs):
-        kw: dict[str, Any] = {}
-        for name, dependency in dependencies.items():
-            if name in kwargs:
-                continue
-            elif dependency.collection:
-                value = dm.get_instances(dependency.interface)
-                value = dependency.collection(value)
-            else:
-                value = dm.get_instance(dependency.interface, optional=dependency.optional)
-            kw[name] = value
-        return func(*args, **{**kwargs, **kw})
+        nonlocal bound
+        current, resolvers = bound
+        if current is not dm.get_register():
+            dm.load(*(d.interface for d in dependencies.values()))
+            current = dm.get_register()
+            resolvers = tuple((name, _get_resolver(current, d)) for name, d in dependencies.items())
+            bound = (current, resolvers)
+        for name, resolve in resolvers:
+            if name not in kwargs:
+                kwargs[name] = resolve()
+        return func(*args, **kwargs)
     return decorator
 
 
+def post_construct(method):
+    setattr(method, POST_CONSTRUCT_MARKER, True)
+    return method
+
+
+def pre_destroy(method):
+    setattr(method, PRE_DESTROY_MARKER, True)
+    return method
+
+
 
 
-def scope(name: LiteralString, profiles: tuple[str, ...] = ()):
+def scope(name: LiteralString, profiles: tuple[str, ...] = (), fork_safe: bool = True):
     if not isinstance(profiles, (list, tuple)):
         profiles = (profiles, )
     if not isinstance(name, str):
@@ -93,18 +200,24 @@ def scope(name: LiteralString, profiles: tuple[str, ...] = ()):
         cls = component(scope=__SESSION,
                         interface=name,
                         profiles=profiles,
+                        fork_safe=fork_safe,
                         )(cls)
         return cls
     return wrapper
 
 Injectable = InjectableDependency(type=InjectableType.component, args=())
+Lazy = InjectableDependency(type=InjectableType.lazy, args=())
 
 def _property(name: str) -> InjectableDependency:
     return InjectableDependency(type=InjectableType.property, args=(name, ))
 
 
 BaseCustomScope = BaseCustomScope
+Provider = Provider
 Property = _property
+Session = session_scope
+Pooled = pooled_scope
 dm = dm
 SINGLETON = SINGLETON
-PROTOTYPE = PROTOTYPE
\ No newline at end of file
+PROTOTYPE = PROTOTYPE
+POOLED = POOLED
\ No newline at end of file
@@ -0,0 +1,66 @@
+from pathlib import Path
+from timeit import timeit
+from typing import Annotated
+import sys
+
+
+path = Path(__file__).parents[1]
+sys.path.append(str(path))
+
+from autumn.public import Injectable, autowired_method, component, dm, PROTOTYPE, SINGLETON
+
+
+class IRepository:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("bench", ))
+class Settings:
+    ...
+
+
+@component(IRepository, scope=SINGLETON, profiles=("bench", ))
+class UserRepository:
+    settings: Annotated[Settings, Injectable]
+
+
+@component(IRepository, scope=SINGLETON, profiles=("bench", ))
+class OrderRepository:
+    settings: Annotated[Settings, Injectable]
+
+
+@component(scope=PROTOTYPE, profiles=("bench", ))
+class Request:
+    settings: Annotated[Settings, Injectable]
+
+
+def plain(settings: Settings, request: Request | None = None) -> None:
+    ...
+
+
+@autowired_method
+def singleton(settings: Annotated[Settings, Injectable]) -> None:
+    ...
+
+
+@autowired_method
+def mixed(settings: Annotated[Settings, Injectable],
+          repositories: Annotated[list[IRepository], Injectable],
+          request: Annotated[Request, Injectable]) -> None:
+    ...
+
+
+def main(number: int = 100000) -> None:
+    dm.init_profiles("bench")
+    dm.start()
+    settings = dm.get_instance(Settings)
+    for name, call in (("plain", lambda: plain(settings)),
+                       ("singleton", singleton),
+                       ("singleton_passed", lambda: singleton(settings=settings)),
+                       ("mixed", mixed)):
+        seconds = timeit(call, number=number)
+        print(f"{name}: {seconds / number * 1e6:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
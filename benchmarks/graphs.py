@@ -0,0 +1,103 @@
+from dataclasses import dataclass, field
+from random import Random
+from time import perf_counter
+from typing import Annotated, Any, Type
+
+from autumn.public import BaseCustomScope, Injectable, Session, component, scope, PROTOTYPE, SINGLETON
+
+
+@dataclass
+class Graph:
+    name: str
+    profiles: tuple[str, ...]
+    decoration_time: float = 0.0
+    components: list[Type] = field(default_factory=list)
+    roots: list[Any] = field(default_factory=list)
+    sessions: list[str] = field(default_factory=list)
+
+
+def declare(graph: Graph, name: str, annotations: dict[str, Any], *,
+            interface: Any = None, scope: str, profiles: tuple[str, ...] = ()) -> Type:
+    cls = type(f"{graph.name}_{name}", (), {"__annotations__": annotations, "__module__": __name__})
+    started = perf_counter()
+    cls = component(interface, scope=scope, profiles=profiles or graph.profiles)(cls)
+    graph.decoration_time += perf_counter() - started
+    graph.components.append(cls)
+    return cls
+
+
+def make_interface(graph: Graph, name: str) -> Type:
+    return type(f"{graph.name}_{name}", (), {"__module__": __name__})
+
+
+def wide_graph(size: int, seed: int = 0) -> Graph:
+    # Many components of mixed scopes, each depending on a few earlier ones
+    random = Random(seed)
+    graph = Graph(name=f"wide{size}", profiles=(f"wide{size}", ))
+    for i in range(size):
+        dependencies = random.sample(graph.components, min(len(graph.components), random.randint(0, 3)))
+        annotations = {f"d{j}": Annotated[d, Injectable] for j, d in enumerate(dependencies)}
+        declare(graph, f"C{i}", annotations, scope=random.choice((SINGLETON, PROTOTYPE)))
+    graph.roots = graph.components[-10:]
+    return graph
+
+
+def chain_graph(depth: int) -> Graph:
+    graph = Graph(name=f"chain{depth}", profiles=(f"chain{depth}", ))
+    previous = declare(graph, "C0", {}, scope=SINGLETON)
+    for i in range(1, depth):
+        previous = declare(graph, f"C{i}", {"previous": Annotated[previous, Injectable]}, scope=PROTOTYPE)
+    graph.roots = [previous]
+    return graph
+
+
+def fan_in_graph(width: int, scope: str = SINGLETON) -> Graph:
+    graph = Graph(name=f"fan_in_{scope}{width}", profiles=(f"fan_in_{scope}{width}", ))
+    interface = make_interface(graph, "IPlugin")
+    for i in range(width):
+        declare(graph, f"Plugin{i}", {}, interface=interface, scope=scope)
+    graph.roots = [declare(graph, "Registry", {"plugins": Annotated[tuple[interface, ...], Injectable]},
+                           scope=PROTOTYPE)]
+    return graph
+
+
+def scoped_graph(size: int) -> Graph:
+    # Components living in a custom scope and in a session scope, on top of
+    # a singleton and prototype base
+    graph = Graph(name=f"scoped{size}", profiles=(f"scoped{size}", ))
+    base = [declare(graph, f"Base{i}", {}, scope=SINGLETON if i % 2 else PROTOTYPE) for i in range(size)]
+    custom = f"{graph.name}_scope"
+    custom_component = declare(graph, "Custom", {}, scope=custom)
+
+    def get_instance(self) -> Any:
+        return custom_component()
+
+    scope(custom, profiles=graph.profiles)(type(f"{graph.name}_Scope", (BaseCustomScope, ),
+                                                {"get_instance": get_instance, "__module__": __name__}))
+    session = declare(graph, "Session", {f"b{i}": Annotated[b, Injectable] for i, b in enumerate(base)},
+                      scope=Session(graph.name))
+    graph.roots = [custom_component, session]
+    graph.sessions = [graph.name]
+    return graph
+
+
+def profiled_graph(size: int, profiles: int, active: int) -> Graph:
+    # Components spread across many profiles, only a few of them are active
+    graph = Graph(name=f"profiles{size}", profiles=tuple(f"profiles{size}_{i}" for i in range(active)))
+    for i in range(size):
+        declare(graph, f"C{i}", {}, scope=SINGLETON, profiles=(f"profiles{size}_{i % profiles}", ))
+    graph.roots = [c for i, c in enumerate(graph.components) if i % profiles < active][:10]
+    return graph
+
+
+def autowired_graph() -> Graph:
+    # Roots are a singleton, a prototype and an interface with several
+    # singleton implementations, used as parameters of an autowired method
+    graph = Graph(name="autowired", profiles=("autowired", ))
+    singleton = declare(graph, "Singleton", {}, scope=SINGLETON)
+    prototype = declare(graph, "Prototype", {"singleton": Annotated[singleton, Injectable]}, scope=PROTOTYPE)
+    interface = make_interface(graph, "IPlugin")
+    for i in range(5):
+        declare(graph, f"Plugin{i}", {}, interface=interface, scope=SINGLETON)
+    graph.roots = [singleton, prototype, interface]
+    return graph
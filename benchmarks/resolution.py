@@ -0,0 +1,72 @@
+from pathlib import Path
+from timeit import timeit
+from typing import Annotated
+import sys
+
+
+path = Path(__file__).parents[1]
+sys.path.append(str(path))
+
+from autumn.public import Injectable, Property, component, dm, PROTOTYPE, SINGLETON
+
+
+class IRepository:
+    ...
+
+
+class IHandler:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("bench", ))
+class Settings:
+    url: Annotated[str, Property("url")]
+    timeout: Annotated[int | None, Property("timeout")]
+
+
+@component(IRepository, scope=SINGLETON, profiles=("bench", ))
+class UserRepository:
+    settings: Annotated[Settings, Injectable]
+
+
+@component(IRepository, scope=SINGLETON, profiles=("bench", ))
+class OrderRepository:
+    settings: Annotated[Settings, Injectable]
+
+
+@component(IHandler, scope=PROTOTYPE, profiles=("bench", ))
+class UserHandler:
+    repositories: Annotated[list[IRepository], Injectable]
+
+
+@component(IHandler, scope=PROTOTYPE, profiles=("bench", ))
+class OrderHandler:
+    repositories: Annotated[tuple[IRepository, ...], Injectable]
+
+
+@component(scope=PROTOTYPE, profiles=("bench", ))
+class Request:
+    settings: Annotated[Settings, Injectable]
+    handlers: Annotated[list[IHandler], Injectable]
+    url: Annotated[str, Property("url")]
+
+
+@component(scope=PROTOTYPE, profiles=("bench", ))
+class Endpoint:
+    request: Annotated[Request, Injectable]
+    settings: Annotated[Settings, Injectable]
+
+
+def main(number: int = 20000) -> None:
+    dm.init_profiles("bench")
+    dm.init_property("url", "http://localhost")
+    dm.start()
+    for name, interface in (("singleton", Settings),
+                            ("prototype", Request),
+                            ("prototype_chain", Endpoint)):
+        seconds = timeit(lambda: dm.get_instance(interface), number=number)
+        print(f"{name}: {seconds / number * 1e6:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
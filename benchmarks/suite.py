@@ -0,0 +1,103 @@
+from argparse import ArgumentParser
+from contextlib import nullcontext
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+from typing import Annotated, Any, Callable
+import json
+import platform
+import sys
+
+
+path = Path(__file__).parents[1]
+sys.path.append(str(path))
+
+from autumn.public import Injectable, autowired_method, dm
+from benchmarks import graphs
+
+
+def _latency(call: Callable[[], Any], number: int, repeat: int = 5) -> float:
+    # Median of repeats, in microseconds per call
+    timings = []
+    for _ in range(repeat):
+        started = perf_counter()
+        for _ in range(number):
+            call()
+        timings.append((perf_counter() - started) / number * 1e6)
+    return median(timings)
+
+
+def _start(graph: graphs.Graph) -> float:
+    dm.init_profiles(*graph.profiles)
+    started = perf_counter()
+    dm.start()
+    return perf_counter() - started
+
+
+def _measure(graph: graphs.Graph, number: int) -> dict[str, Any]:
+    with dm.copy():
+        result = {"components": len(graph.components),
+                  "decoration_s": graph.decoration_time,
+                  "start_s": _start(graph),
+                  "get_instance_us": {}}
+        with dm.session(graph.sessions[0]) if graph.sessions else nullcontext():
+            for root in graph.roots:
+                dm.get_instance(root)
+                result["get_instance_us"][root.__name__] = _latency(lambda: dm.get_instance(root), number)
+    return result
+
+
+def _measure_autowired(graph: graphs.Graph, number: int) -> dict[str, Any]:
+    singleton, prototype, collection = graph.roots
+
+    def plain(a: Any, b: Any, c: Any) -> None:
+        ...
+
+    @autowired_method
+    def autowired(a: Annotated[singleton, Injectable],
+                  b: Annotated[prototype, Injectable],
+                  c: Annotated[list[collection], Injectable]) -> None:
+        ...
+
+    with dm.copy():
+        _start(graph)
+        a, b, c = dm.get_instance(singleton), dm.get_instance(prototype), dm.get_instances(collection)
+        autowired()
+        return {"plain_us": _latency(lambda: plain(a, b, c), number),
+                "autowired_us": _latency(autowired, number),
+                "autowired_passed_us": _latency(lambda: autowired(a=a, b=b, c=c), number)}
+
+
+def run(scale: float = 1.0, number: int = 2000) -> dict[str, Any]:
+    size = int(2000 * scale)
+    results = {}
+    for graph in (graphs.wide_graph(size),
+                  graphs.chain_graph(max(int(200 * scale), 2)),
+                  graphs.fan_in_graph(int(500 * scale)),
+                  graphs.fan_in_graph(int(50 * scale), graphs.PROTOTYPE),
+                  graphs.scoped_graph(int(20 * scale)),
+                  graphs.profiled_graph(size, profiles=50, active=5)):
+        results[graph.name] = _measure(graph, number)
+    results["autowired"] = _measure_autowired(graphs.autowired_graph(), number * 10)
+    return {"python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "scale": scale,
+            "results": results}
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Autumn registration, start and resolution benchmarks")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for graph sizes")
+    parser.add_argument("--number", type=int, default=2000, help="calls per latency measurement")
+    parser.add_argument("--output", type=Path, help="write JSON results to the file instead of stdout")
+    args = parser.parse_args()
+    dm.init(test_mode=True)
+    report = json.dumps(run(args.scale, args.number), indent=2)
+    if args.output:
+        args.output.write_text(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,8 +17,8 @@ class TaskSession(BaseCustomScope):
     sessionManager: Annotated[SessionManager, Injectable]
 
     def get_instance(self) -> Task:
-        value = self.sessionManager.get_session_value("task_session")
-        return Task(value)
+        session = self.sessionManager.session("task_session")
+        return self.cached(session, lambda: Task(session.value))
 
 
 @component(TaskProvider, scope=SINGLETON, profiles=("prod", "system"))
@@ -0,0 +1,11 @@
+from autumn.core.scope import SINGLETON
+from autumn.public import component
+
+
+class IWidget:
+    ...
+
+
+@component(IWidget, scope=SINGLETON, profiles=("test_aliased", ))
+class Widget:
+    ...
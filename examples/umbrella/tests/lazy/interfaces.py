@@ -0,0 +1,6 @@
+class IStore:
+    ...
+
+
+class IService:
+    ...
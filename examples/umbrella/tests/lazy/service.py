@@ -0,0 +1,10 @@
+from typing import Annotated
+
+from autumn.core.scope import PROTOTYPE
+from autumn.public import Injectable, component
+from examples.umbrella.tests.lazy.interfaces import IService, IStore
+
+
+@component(IService, scope=PROTOTYPE, profiles=("test_discovery", ))
+class Service:
+    store: Annotated[IStore, Injectable]
@@ -0,0 +1,8 @@
+from autumn.core.scope import SINGLETON
+from autumn.public import component
+from examples.umbrella.tests.lazy.interfaces import IStore
+
+
+@component(IStore, scope=SINGLETON, profiles=("test_discovery", ))
+class MemoryStore:
+    ...
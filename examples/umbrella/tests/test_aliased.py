@@ -0,0 +1,25 @@
+from importlib.util import module_from_spec, spec_from_file_location
+import sys
+
+from autumn.public import dm
+from examples.umbrella.tests.aliased import widget
+
+
+def test_module_imported_twice():
+    # The same file imported under another name defines new classes,
+    # which are found by their file instead of their identity
+    spec = spec_from_file_location("aliased_widget", widget.__file__)
+    alias = module_from_spec(spec)
+    sys.modules[spec.name] = alias
+    try:
+        spec.loader.exec_module(alias)
+        assert alias.IWidget is not widget.IWidget
+        with dm.copy():
+            dm.init_profiles("test_aliased")
+            dm.start()
+            instance = dm.get_instance(widget.IWidget)
+            assert isinstance(instance, widget.Widget)
+            assert dm.get_instance(alias.IWidget) is instance
+            assert dm.get_instances(alias.IWidget) == [instance]
+    finally:
+        del sys.modules[spec.name]
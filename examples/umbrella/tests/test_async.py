@@ -0,0 +1,128 @@
+from typing import Annotated
+import asyncio
+
+import pytest
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.exceptions import AutomnConfigurationError
+from autumn.public import BaseCustomScope, Injectable, autowired_method, component, dm, post_construct, scope
+
+
+# Pool and Cache wait for each other, so they are opened only if both
+# are resolved concurrently
+opening = asyncio.Barrier(2)
+
+
+@component(scope=SINGLETON, profiles=("test_async", ))
+class Pool:
+    opened: bool = False
+
+    @post_construct
+    async def open(self) -> None:
+        await asyncio.wait_for(opening.wait(), 5)
+        object.__setattr__(self, "opened", True)
+
+
+@component(scope=SINGLETON, profiles=("test_async", ))
+class Cache:
+    opened: bool = False
+
+    @post_construct
+    async def open(self) -> None:
+        await asyncio.wait_for(opening.wait(), 5)
+        object.__setattr__(self, "opened", True)
+
+
+@component(scope=PROTOTYPE, profiles=("test_async", ))
+class Service:
+    pool: Annotated[Pool, Injectable]
+    cache: Annotated[Cache, Injectable]
+
+
+@component(scope="test_async_scope", profiles=("test_async", ))
+class Request:
+    id: int = 0
+
+
+@scope("test_async_scope", profiles=("test_async", ))
+class RequestScope(BaseCustomScope):
+
+    async def get_instance(self) -> Request:
+        await asyncio.sleep(0)
+        return Request(1)
+
+
+@autowired_method
+async def handle(request: Annotated[Request, Injectable],
+                 services: Annotated[list[Service], Injectable]) -> tuple[int, int]:
+    return request.id, len(services)
+
+
+def test_async_resolution():
+    with dm.copy():
+        dm.init_profiles("test_async")
+        dm.start()
+
+        async def main():
+            first, second = await asyncio.gather(dm.aget_instance(Service),
+                                                 dm.aget_instance(Service))
+            assert first is not second
+            assert first.pool is second.pool and first.pool.opened
+            assert first.cache is second.cache and first.cache.opened
+            assert await handle() == (1, 1)
+
+        asyncio.run(main())
+        assert dm.get_instance(Pool).opened
+
+
+def test_sync_resolution_of_async_components():
+    with dm.copy():
+        dm.init_profiles("test_async")
+        dm.start()
+        with pytest.raises(AutomnConfigurationError):
+            dm.get_instance(Service)
+        with pytest.raises(AutomnConfigurationError):
+            dm.get_instance(Request)
+
+
+@component(scope=SINGLETON, profiles=("test_async_drafts", ))
+class Driver:
+
+    @post_construct
+    async def connect(self) -> None:
+        await asyncio.sleep(0.01)
+
+
+@component(scope=SINGLETON, profiles=("test_async_drafts", ))
+class Engine:
+    driver: Annotated[Driver, Injectable]
+    ready: bool = False
+
+    @post_construct
+    def start(self) -> None:
+        object.__setattr__(self, "ready", True)
+
+
+@component(scope=SINGLETON, profiles=("test_async_drafts", ))
+class Repository:
+    engine: Annotated[Engine, Injectable]
+    seen: tuple = ()
+
+    @post_construct
+    def check(self) -> None:
+        object.__setattr__(self, "seen", (self.engine.ready, self.engine.driver))
+
+
+@component(scope=PROTOTYPE, profiles=("test_async_drafts", ))
+class UseCase:
+    engine: Annotated[Engine, Injectable]
+    repository: Annotated[Repository, Injectable]
+
+
+def test_concurrent_dependencies_do_not_share_drafts():
+    with dm.copy():
+        dm.init_profiles("test_async_drafts")
+        dm.start()
+        use_case = asyncio.run(dm.aget_instance(UseCase))
+        assert use_case.repository.seen == (True, use_case.engine.driver)
+        assert use_case.repository.engine is use_case.engine
@@ -0,0 +1,118 @@
+from typing import Annotated, ClassVar
+import asyncio
+
+import pytest
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.exceptions import AutomnConfigurationError
+from autumn.public import Injectable, Lazy, Provider, autowired_method, component, dm, post_construct
+
+
+@component(scope=SINGLETON, profiles=("test_autowired", ))
+class Storage:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_autowired", ))
+class AsyncStorage:
+
+    @post_construct
+    async def open(self) -> None:
+        ...
+
+
+@component(scope=PROTOTYPE, profiles=("test_autowired", ))
+class Report:
+    built: ClassVar[list["Report"]] = []
+
+    def __post_init__(self) -> None:
+        self.built.append(self)
+
+    def render(self) -> str:
+        return "report"
+
+
+@autowired_method
+def get_storage(storage: Annotated[Storage, Injectable]) -> Storage:
+    return storage
+
+
+@autowired_method
+def get_async_storage(storage: Annotated[AsyncStorage, Injectable]) -> AsyncStorage:
+    return storage
+
+
+@autowired_method
+def get_report(report: Annotated[Report, Lazy]) -> Report:
+    return report
+
+
+@autowired_method
+async def aget_report(report: Annotated[Report, Lazy]) -> Report:
+    return report
+
+
+@autowired_method
+def get_reports(reports: Annotated[Provider[Report], Injectable],
+                storages: Annotated[Provider[list[Storage]], Injectable]) -> tuple[Provider, Provider]:
+    return reports, storages
+
+
+@autowired_method
+async def aget_reports(reports: Annotated[Provider[Report], Injectable]) -> Provider:
+    return reports
+
+
+def test_rebinding():
+    with dm.copy():
+        dm.init_profiles("test_autowired")
+        dm.start()
+        storage = get_storage()
+        assert storage is dm.get_instance(Storage)
+        dm.stop()
+        dm.start()
+        assert get_storage() is dm.get_instance(Storage) is not storage
+        with dm.copy():
+            dm.start()
+            assert get_storage() is dm.get_instance(Storage)
+        assert get_storage() is dm.get_instance(Storage)
+    with dm.clear():
+        dm.init_profiles("test", "test_autowired")
+        dm.start()
+        assert get_storage() is dm.get_instance(Storage)
+
+
+def test_passed_arguments_are_not_resolved():
+    storage = AsyncStorage()
+    with dm.copy():
+        dm.init_profiles("test_autowired")
+        dm.start()
+        assert get_async_storage(storage=storage) is storage
+        with pytest.raises(AutomnConfigurationError):
+            get_async_storage()
+
+
+def test_lazy_parameters():
+    Report.built.clear()
+    with dm.copy():
+        dm.init_profiles("test_autowired")
+        dm.start()
+        report = get_report()
+        assert not Report.built
+        assert report.render() == "report" and len(Report.built) == 1
+        report = asyncio.run(aget_report())
+        assert len(Report.built) == 1
+        assert report.render() == "report" and len(Report.built) == 2
+
+
+def test_provider_parameters():
+    Report.built.clear()
+    with dm.copy():
+        dm.init_profiles("test_autowired")
+        dm.start()
+        reports, storages = get_reports()
+        assert not Report.built
+        assert reports() is not reports() and len(Report.built) == 2
+        assert storages() == [dm.get_instance(Storage)]
+        reports = asyncio.run(aget_reports())
+        assert isinstance(asyncio.run(reports.aget()), Report)
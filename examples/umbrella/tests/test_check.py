@@ -0,0 +1,81 @@
+from typing import Annotated
+import asyncio
+
+import pytest
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.exceptions import AutomnAmbiguousDependency, AutomnCircularDependency
+from autumn.public import Injectable, component, dm
+
+
+class IStep:
+    ...
+
+
+class ISecond:
+    ...
+
+
+class IMissing:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_check", ))
+class First:
+    second: Annotated[ISecond, Injectable]
+
+
+@component(scope=SINGLETON, profiles=("test_check", ))
+class Third:
+    first: Annotated[First, Injectable]
+
+
+@component(ISecond, scope=PROTOTYPE, profiles=("test_check", ))
+class Second:
+    third: Annotated[Third, Injectable]
+
+
+@component(IStep, scope=SINGLETON, profiles=("test_check_ambiguous", ))
+class Step:
+    ...
+
+
+@component(IStep, scope=SINGLETON, profiles=("test_check_ambiguous", ))
+class OtherStep:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_check_ambiguous", ))
+class Pipeline:
+    step: Annotated[IStep, Injectable]
+
+
+@component(scope=PROTOTYPE, profiles=("test_check_optional", ))
+class Reporter:
+    missing: Annotated[IMissing | None, Injectable]
+
+
+def test_cycle_reported():
+    with dm.copy():
+        dm.init_profiles("test_check")
+        with pytest.warns(AutomnCircularDependency, match=r"First.second -> Second.third -> Third.first -> First"):
+            dm.start()
+        [cycle] = dm.get_register().cycles
+        assert [(c.cls, name) for c, name in cycle] == [(First, "second"), (Second, "third"), (Third, "first")]
+        first = dm.get_instance(First)
+        assert first.second.third.first is first
+
+
+def test_ambiguous_dependency():
+    with dm.copy():
+        dm.init_profiles("test_check_ambiguous")
+        with pytest.raises(AutomnAmbiguousDependency, match="Pipeline"):
+            dm.start()
+
+
+def test_missing_optional_dependency():
+    with dm.copy():
+        dm.init_profiles("test_check_optional")
+        dm.start()
+        assert dm.get_instance(Reporter).missing is None
+        assert asyncio.run(dm.aget_instance(Reporter)).missing is None
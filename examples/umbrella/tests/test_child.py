@@ -0,0 +1,95 @@
+from typing import Annotated, ClassVar
+import asyncio
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.public import BaseCustomScope, Injectable, Provider, component, dm, pre_destroy, scope
+
+
+class IClient:
+    ...
+
+
+@component(IClient, scope=SINGLETON, profiles=("test_child", ))
+class DefaultClient(IClient):
+    ...
+
+
+class RequestClient(IClient):
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_child", ))
+class Settings:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_child", ))
+class Service:
+    closed: ClassVar[list["Service"]] = []
+    client: Annotated[IClient, Injectable]
+    clients: Annotated[Provider[IClient], Injectable]
+
+    @pre_destroy
+    def close(self) -> None:
+        self.closed.append(self)
+
+
+@component(scope=PROTOTYPE, profiles=("test_child", ))
+class Handler:
+    settings: Annotated[Settings, Injectable]
+    service: Annotated[Service, Injectable]
+
+
+@scope("test_child_request", profiles=("test_child", ))
+class RequestScope(BaseCustomScope):
+    client: Annotated[IClient, Injectable]
+
+    def get_instance(self) -> "Request":
+        return self.cached(self, lambda: Request(self.client))
+
+
+@component(scope="test_child_request", profiles=("test_child", ))
+class Request:
+    client: IClient
+
+
+def test_child():
+    Service.closed.clear()
+    client = RequestClient()
+    with dm.copy():
+        dm.init_profiles("test_child")
+        dm.start()
+        service = dm.get_instance(Service)
+        with dm.child({IClient: client}) as child:
+            handler = child.get_instance(Handler)
+            assert child.get_instance(IClient) is client
+            assert handler.settings is dm.get_instance(Settings)
+            assert handler.service is child.get_instance(Service) is not service
+            assert handler.service.client is handler.service.clients() is client
+        assert Service.closed == [handler.service]
+        assert isinstance(dm.get_instance(Handler).service.client, DefaultClient)
+
+
+def test_async_child():
+    async def main() -> None:
+        async with dm.achild({IClient: client}) as child:
+            assert (await child.aget_instance(Handler)).service.client is client
+
+    client = RequestClient()
+    with dm.copy():
+        dm.init_profiles("test_child")
+        dm.start()
+        asyncio.run(main())
+
+
+def test_child_custom_scope():
+    client = RequestClient()
+    with dm.copy():
+        dm.init_profiles("test_child")
+        dm.start()
+        request = dm.get_instance(Request)
+        with dm.child({IClient: client}) as child:
+            assert child.get_instance(Request).client is client
+            assert child.get_instance(Request) is child.get_instance(Request)
+        assert dm.get_instance(Request) is request
+        assert isinstance(request.client, DefaultClient)
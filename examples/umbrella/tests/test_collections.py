@@ -0,0 +1,59 @@
+from typing import Annotated
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.public import Injectable, component, dm
+
+
+class IPlugin:
+    ...
+
+
+class IStep:
+    ...
+
+
+@component(IPlugin, scope=SINGLETON, profiles=("test_collections", ), order=2)
+class Audit:
+    ...
+
+
+@component(IPlugin, scope=SINGLETON, profiles=("test_collections", ), order=-1)
+class Auth:
+    ...
+
+
+@component(IPlugin, scope=SINGLETON, profiles=("test_collections", ))
+class Cache:
+    ...
+
+
+@component(IStep, scope=SINGLETON, profiles=("test_collections", ))
+class Parse:
+    ...
+
+
+@component(IStep, scope=PROTOTYPE, profiles=("test_collections", ))
+class Render:
+    ...
+
+
+@component(scope=PROTOTYPE, profiles=("test_collections", ))
+class Pipeline:
+    plugins: Annotated[tuple[IPlugin, ...], Injectable]
+    listed: Annotated[list[IPlugin], Injectable]
+    steps: Annotated[tuple[IStep, ...], Injectable]
+
+
+def test_cached_collections():
+    with dm.copy():
+        dm.init_profiles("test_collections")
+        dm.start()
+        first, second = dm.get_instance(Pipeline), dm.get_instance(Pipeline)
+        assert [type(p) for p in first.plugins] == [Auth, Cache, Audit]
+        assert first.plugins is second.plugins
+        assert first.listed == list(first.plugins) and first.listed is not second.listed
+        assert first.steps[0] is second.steps[0] and first.steps[1] is not second.steps[1]
+        assert dm.get_instances(IPlugin) == list(first.plugins)
+        dm.stop()
+        dm.start()
+        assert dm.get_instance(Pipeline).plugins[0] is not first.plugins[0]
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from typing import Annotated, ClassVar
+import time
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.public import Injectable, component, dm
+
+THREADS = 16
+
+
+@component(scope=SINGLETON, profiles=("test_concurrency", ))
+class SlowSingleton:
+    builds: ClassVar[list[int]] = []
+
+    def __post_init__(self) -> None:
+        time.sleep(0.01)
+        self.builds.append(1)
+
+
+class IWorker:
+    ...
+
+
+@component(scope=PROTOTYPE, profiles=("test_concurrency", ))
+class Peer:
+    worker: Annotated[IWorker, Injectable]
+
+
+@component(IWorker, scope=PROTOTYPE, profiles=("test_concurrency", ))
+class Worker:
+    singleton: Annotated[SlowSingleton, Injectable]
+    peer: Annotated[Peer, Injectable]
+
+
+def test_concurrent_resolution():
+    with dm.copy():
+        dm.init_profiles("test_concurrency")
+        dm.start()
+        barrier = Barrier(THREADS)
+
+        def resolve(_):
+            barrier.wait()
+            result = []
+            for _ in range(200):
+                worker = dm.get_instance(IWorker)
+                assert worker.peer.worker is worker
+                result.append(worker.singleton)
+            return result
+
+        with ThreadPoolExecutor(THREADS) as executor:
+            singletons = {id(s) for r in executor.map(resolve, range(THREADS)) for s in r}
+        assert len(singletons) == 1
+        assert len(SlowSingleton.builds) == 1
+
+
+# Both singletons wait for each other, so starting succeeds only if
+# they are built concurrently
+warmup_barrier = Barrier(2, timeout=5)
+
+
+@component(scope=SINGLETON, profiles=("test_warmup", ))
+class Database:
+
+    def __post_init__(self) -> None:
+        warmup_barrier.wait()
+        time.sleep(0.01)
+
+
+@component(scope=SINGLETON, profiles=("test_warmup", ))
+class Broker:
+
+    def __post_init__(self) -> None:
+        warmup_barrier.wait()
+        time.sleep(0.01)
+
+
+@component(scope=SINGLETON, profiles=("test_warmup", ))
+class Application:
+    database: Annotated[Database, Injectable]
+    broker: Annotated[Broker, Injectable]
+
+
+def test_eager_start():
+    with dm.copy():
+        dm.init_profiles("test_warmup")
+        dm.start(eager=True, max_workers=4)
+        report = dm.get_warmup_report()
+        assert report[Database] >= 0.01 and report[Broker] >= 0.01
+        assert report[Application] < min(report[Database], report[Broker])
+        application = dm.get_instance(Application)
+        assert application.database is dm.get_instance(Database)
@@ -0,0 +1,72 @@
+from contextvars import ContextVar
+from typing import Hashable
+import gc
+
+from autumn.core.scope import _CustomScope
+from autumn.public import BaseCustomScope, component, dm, scope
+
+
+current_session: ContextVar[Hashable] = ContextVar("current_session")
+
+
+class Session:
+    ...
+
+
+@scope("test_custom_request", profiles=("test_custom_scope", ))
+class RequestScope(BaseCustomScope):
+
+    def get_instance(self) -> "Request":
+        return self.cached(current_session.get(), Request)
+
+
+@component(scope="test_custom_request", profiles=("test_custom_scope", ))
+class Request:
+    ...
+
+
+def test_weak_sessions():
+    scope, session = RequestScope(), Session()
+    request = scope.cached(session, Request)
+    assert scope.cached(session, Request) is request
+    assert scope.cached(Session(), Request) is not request
+    del session
+    gc.collect()
+    assert not scope._autumn_weak_instances
+
+
+def test_strong_sessions():
+    scope = RequestScope()
+    request = scope.cached("first", Request)
+    assert scope.cached("first", Request) is request
+    assert scope.cached("second", Request) is not request
+    scope.release("first")
+    scope.release("unknown")
+    assert scope.cached("first", Request) is not request
+    assert set(scope._autumn_instances) == {"first", "second"}
+
+
+def test_scope_is_resolved_once(monkeypatch):
+    resolutions = []
+    get_scope = _CustomScope._get_scope
+
+    def counted(self: _CustomScope) -> BaseCustomScope:
+        resolutions.append(self)
+        return get_scope(self)
+
+    monkeypatch.setattr(_CustomScope, "_get_scope", counted)
+    with dm.copy():
+        dm.init_profiles("test_custom_scope")
+        dm.start()
+        token = current_session.set("first")
+        try:
+            request = dm.get_instance(Request)
+            assert dm.get_instance(Request) is request
+        finally:
+            current_session.reset(token)
+        token = current_session.set("second")
+        try:
+            assert dm.get_instance(Request) is not request
+        finally:
+            current_session.reset(token)
+    assert len(resolutions) == 1
@@ -0,0 +1,40 @@
+from typing import ClassVar
+import sys
+
+from autumn.core.discovery import discovery
+from autumn.public import Pooled, component, dm, pre_destroy
+from examples.umbrella.tests.lazy.interfaces import IService, IStore
+
+PACKAGE = "examples.umbrella.tests.lazy"
+
+
+@component(scope=Pooled(min_size=2), profiles=("test_discovery", ))
+class Connection:
+    closed: ClassVar[list["Connection"]] = []
+
+    @pre_destroy
+    def close(self) -> None:
+        self.closed.append(self)
+
+
+def test_discovery(monkeypatch):
+    dm.discover(PACKAGE)
+    with dm.copy():
+        dm.init_profiles("test_discovery")
+        dm.start()
+        assert f"{PACKAGE}.service" not in sys.modules
+        assert f"{PACKAGE}.store" not in sys.modules
+        pool = dm.get_pool_metrics()[Connection]
+        service = dm.get_instance(IService)
+        assert dm.get_pool_metrics()[Connection] == pool and not Connection.closed
+        assert f"{PACKAGE}.store" in sys.modules
+        assert service.store is dm.get_instance(IStore)
+        assert type(service).__module__ == f"{PACKAGE}.service"
+        calls = []
+        load = discovery.load
+        monkeypatch.setattr(discovery, "load", lambda *args: calls.append(args) or load(*args))
+        monkeypatch.setitem(discovery.pending, "Unrelated", {f"{PACKAGE}.unrelated"})
+        for _ in range(3):
+            dm.get_instance(IStore)
+            dm.get_instance(IService)
+        assert not calls
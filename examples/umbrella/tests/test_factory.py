@@ -0,0 +1,108 @@
+from typing import Annotated
+import asyncio
+
+import pytest
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.exceptions import AutomnConfigurationError
+from autumn.public import Injectable, Property, component, dm, factory
+
+
+class Pool:
+    # Stands for a third party class which cannot be a component
+    def __init__(self, dsn: str, size: int) -> None:
+        self.dsn = dsn
+        self.size = size
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@component(scope=SINGLETON, profiles=("test_factory", ))
+class Settings:
+    size: Annotated[int, Property("factory.size")]
+
+
+@factory(scope=SINGLETON, profiles=("test_factory", ), pre_destroy="close")
+def create_pool(dsn: Annotated[str, Property("factory.dsn")],
+                settings: Annotated[Settings, Injectable]) -> Pool:
+    return Pool(dsn, settings.size)
+
+
+@component(scope=PROTOTYPE, profiles=("test_factory", ))
+class Repository:
+    pool: Annotated[Pool, Injectable]
+
+
+class IFirst:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_factory_cycle", ))
+class Second:
+    first: Annotated[IFirst, Injectable]
+
+
+@factory(IFirst, scope=SINGLETON, profiles=("test_factory_cycle", ))
+def create_first(second: Annotated[Second, Injectable]) -> object:
+    return object()
+
+
+def test_factory():
+    with dm.copy():
+        dm.init_profiles("test_factory")
+        dm.init_property("factory.dsn", "postgres://")
+        dm.init_property("factory.size", 4)
+        dm.start()
+        pool = dm.get_instance(Repository).pool
+        assert (pool.dsn, pool.size) == ("postgres://", 4)
+        assert dm.get_instance(Repository).pool is pool
+        dm.stop()
+        assert pool.closed
+
+
+def test_factory_cycle():
+    with dm.copy():
+        dm.init_profiles("test_factory_cycle")
+        with pytest.raises(AutomnConfigurationError, match="Second.first -> create_first.second -> Second"):
+            dm.start()
+
+
+class Connection:
+    closed: bool = False
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+class IChannel:
+    ...
+
+
+@factory(scope=SINGLETON, profiles=("test_factory_async", ), pre_destroy="aclose")
+def create_connection() -> Connection:
+    return Connection()
+
+
+@factory(IChannel, scope=SINGLETON, profiles=("test_factory_untyped", ), pre_destroy="aclose")
+def create_channel():
+    return Connection()
+
+
+def test_asynchronous_destroy():
+    with dm.copy():
+        dm.init_profiles("test_factory_async")
+        dm.start()
+        connection = dm.get_instance(Connection)
+        with pytest.raises(AutomnConfigurationError, match="astop"):
+            dm.stop()
+        asyncio.run(dm.astop())
+        assert connection.closed
+
+    with dm.copy():
+        dm.init_profiles("test_factory_untyped")
+        dm.start()
+        dm.get_instance(IChannel)
+        with pytest.raises(AutomnConfigurationError, match="aclose"):
+            dm.stop()
@@ -0,0 +1,117 @@
+from threading import Event, Thread
+from typing import Annotated
+import os
+import traceback
+
+import pytest
+
+from autumn.core.discovery import discovery
+from autumn.core.metrics import metrics
+from autumn.core.profiler import profiler
+from autumn.core.scope import SINGLETON
+from autumn.public import BaseCustomScope, Injectable, Lazy, Pooled, autowired_method, component, dm, scope
+
+
+@component(scope=SINGLETON, profiles=("test_fork", ))
+class Settings:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_fork", ), fork_safe=False)
+class Socket:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_fork", ))
+class Client:
+    settings: Annotated[Settings, Injectable]
+    socket: Annotated[Socket, Lazy]
+
+
+@component(scope=Pooled(min_size=1), profiles=("test_fork", ), fork_safe=False)
+class Cursor:
+    ...
+
+
+@scope("test_fork_request", profiles=("test_fork", ), fork_safe=False)
+class RequestScope(BaseCustomScope):
+
+    def get_instance(self) -> "Request":
+        return self.cached(self, Request)
+
+
+@component(scope="test_fork_request", profiles=("test_fork", ))
+class Request:
+    ...
+
+
+@autowired_method
+def get_socket(socket: Annotated[Socket, Injectable]) -> Socket:
+    return socket
+
+
+def test_fork():
+    with dm.copy():
+        dm.init_profiles("test_fork")
+        dm.start()
+        dm.prepare_fork()
+        report = dm.get_warmup_report()
+        assert Settings in report and Socket not in report and Client not in report
+        settings, client = dm.get_instance(Settings), dm.get_instance(Client)
+        socket, request = get_socket(), dm.get_instance(Request)
+        with dm.borrow(Cursor) as cursor:
+            ...
+        dm.after_fork()
+        assert dm.get_instance(Settings) is settings
+        assert dm.get_instance(Client) is not client
+        assert get_socket() is dm.get_instance(Socket) is not socket
+        assert dm.get_instance(Request) is not request
+        with dm.borrow(Cursor) as borrowed:
+            assert borrowed is not cursor
+        assert dm.get_pool_metrics()[Cursor].size == 1
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_forked_child():
+    locks = (discovery._lock, metrics._lock, profiler._lock)
+    held, forked = Event(), Event()
+
+    def hold() -> None:
+        # Locks held by another thread while forking stay held in the child
+        for lock in locks:
+            lock.acquire()
+        held.set()
+        forked.wait()
+        for lock in locks:
+            lock.release()
+
+    with dm.copy():
+        dm.init_profiles("test_fork")
+        dm.start()
+        dm.prepare_fork()
+        settings, socket = dm.get_instance(Settings), get_socket()
+        thread = Thread(target=hold)
+        thread.start()
+        held.wait()
+        try:
+            pid = os.fork()
+            if pid == 0:
+                status = 1
+                try:
+                    assert all(lock.acquire(timeout=1) for lock in
+                               (discovery._lock, metrics._lock, profiler._lock))
+                    dm.after_fork()
+                    assert dm.get_instance(Settings) is settings
+                    assert dm.get_instance(Client).settings is settings
+                    assert get_socket() is dm.get_instance(Socket) is not socket
+                    status = 0
+                except BaseException:
+                    traceback.print_exc()
+                finally:
+                    os._exit(status)
+        finally:
+            forked.set()
+            thread.join()
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert dm.get_instance(Socket) is socket
@@ -0,0 +1,65 @@
+from typing import Annotated, ClassVar
+
+from autumn.core.scope import SINGLETON
+from autumn.public import Injectable, component, dm, pre_destroy
+
+
+class IPlugin:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_incremental", ))
+class Settings:
+    destroyed: ClassVar[list["Settings"]] = []
+
+    @pre_destroy
+    def close(self) -> None:
+        self.destroyed.append(self)
+
+
+@component(IPlugin, scope=SINGLETON, profiles=("test_incremental", ))
+class Logging(IPlugin):
+    ...
+
+
+@component(IPlugin, scope=SINGLETON, profiles=("test_incremental", "test_incremental_metrics"))
+class Metrics(IPlugin):
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_incremental", ))
+class Registry:
+    settings: Annotated[Settings, Injectable]
+    plugins: Annotated[list[IPlugin], Injectable]
+
+
+def test_incremental():
+    Settings.destroyed.clear()
+    with dm.copy():
+        dm.init_profiles("test_incremental")
+        dm.start()
+        settings, registry = dm.get_instance(Settings), dm.get_instance(Registry)
+        with dm.copy(incremental=True):
+            dm.init_profiles("test_incremental_metrics")
+            dm.start()
+            assert dm.get_instance(Settings) is settings
+            assert dm.get_instance(Registry) is not registry
+            assert len(dm.get_instance(Registry).plugins) == 2
+        assert not Settings.destroyed
+        assert dm.get_instance(Settings) is settings
+        assert dm.get_instance(Registry) is registry
+    assert Settings.destroyed == [settings]
+
+
+def test_copy():
+    Settings.destroyed.clear()
+    with dm.copy():
+        dm.init_profiles("test_incremental")
+        dm.start()
+        settings = dm.get_instance(Settings)
+        with dm.copy():
+            dm.start()
+            copied = dm.get_instance(Settings)
+            assert copied is not settings
+        assert Settings.destroyed == [copied]
+        assert dm.get_instance(Settings) is settings
@@ -0,0 +1,53 @@
+from typing import Annotated, ClassVar
+import warnings
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.public import Lazy, component, dm
+
+
+class IReport:
+    ...
+
+
+class IConsumer:
+    ...
+
+
+@component(IReport, scope=PROTOTYPE, profiles=("test_lazy", ))
+class DailyReport:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_lazy", ))
+class HeavyClient:
+    built: ClassVar[int] = 0
+    consumer: Annotated[IConsumer, Lazy]
+
+    def __post_init__(self) -> None:
+        HeavyClient.built += 1
+
+    def fetch(self) -> str:
+        return "data"
+
+
+@component(IConsumer, scope=PROTOTYPE, profiles=("test_lazy", ))
+class JobConsumer:
+    client: Annotated[HeavyClient, Lazy]
+    reports: Annotated[list[IReport], Lazy]
+
+
+def test_lazy_dependency():
+    with dm.copy():
+        dm.init_profiles("test_lazy")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            dm.start()
+        assert dm.get_register().cycles == []
+        consumer = dm.get_instance(IConsumer)
+        assert HeavyClient.built == 0
+        assert consumer.client.fetch() == "data"
+        assert HeavyClient.built == 1
+        assert dm.get_instance(IConsumer).client.fetch() == "data"
+        assert HeavyClient.built == 1
+        assert [type(r) for r in consumer.reports] == [DailyReport]
+        assert isinstance(consumer.client.consumer.client, HeavyClient)
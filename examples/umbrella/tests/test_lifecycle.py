@@ -0,0 +1,99 @@
+from typing import Annotated, ClassVar
+import asyncio
+
+import pytest
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.exceptions import AutomnConfigurationError
+from autumn.public import Injectable, Session, component, dm, post_construct, pre_destroy
+
+events: list[str] = []
+
+
+@component(scope=SINGLETON, profiles=("test_lifecycle", ))
+class Pool:
+
+    @post_construct
+    def open(self) -> None:
+        events.append("open pool")
+
+    @pre_destroy
+    def close(self) -> None:
+        events.append("close pool")
+
+
+@component(scope=SINGLETON, profiles=("test_lifecycle", ))
+class Repository:
+    pool: Annotated[Pool, Injectable]
+
+    @pre_destroy
+    def close(self) -> None:
+        assert events[-1] != "close pool"
+        events.append("close repository")
+
+
+@component(scope=PROTOTYPE, profiles=("test_lifecycle", ))
+class Cursor:
+    repository: Annotated[Repository, Injectable]
+
+    @pre_destroy
+    def close(self) -> None:
+        events.append("close cursor")
+
+
+@component(scope=Session("transaction"), profiles=("test_lifecycle", ))
+class Transaction:
+    pool: Annotated[Pool, Injectable]
+
+    @pre_destroy
+    def rollback(self) -> None:
+        events.append("rollback")
+
+
+@component(scope=SINGLETON, profiles=("test_lifecycle_async", ))
+class AsyncPool:
+    closed: ClassVar[list[bool]] = []
+
+    @pre_destroy
+    async def close(self) -> None:
+        await asyncio.sleep(0)
+        self.closed.append(True)
+
+
+def test_stop():
+    events.clear()
+    with dm.copy():
+        dm.init_profiles("test_lifecycle")
+        dm.start()
+        dm.get_instance(Repository)
+        dm.stop()
+        assert events == ["open pool", "close repository", "close pool"]
+        dm.start()
+        assert dm.get_instance(Pool)
+        assert events[-1] == "open pool"
+    assert events[-1] == "close pool"
+
+
+def test_session_disposal():
+    events.clear()
+    with dm.copy():
+        dm.init_profiles("test_lifecycle")
+        dm.start()
+        with dm.session("transaction"):
+            dm.get_instance(Transaction)
+            dm.get_instance(Cursor)
+            dm.get_instance(Transaction)
+        assert events == ["open pool", "close cursor", "rollback"]
+        dm.get_instance(Cursor)
+    assert events[3:] == ["close repository", "close pool"]
+
+
+def test_asynchronous_stop():
+    with dm.copy():
+        dm.init_profiles("test_lifecycle_async")
+        dm.start()
+        dm.get_instance(AsyncPool)
+        with pytest.raises(AutomnConfigurationError):
+            dm.stop()
+        asyncio.run(dm.astop())
+        assert AsyncPool.closed == [True]
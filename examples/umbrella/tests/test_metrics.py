@@ -0,0 +1,106 @@
+from typing import Annotated
+import random
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.exceptions import AutomnConfigurationError
+from autumn.public import Injectable, autowired_method, component, dm
+
+import pytest
+
+
+@component(scope=SINGLETON, profiles=("test_metrics", ))
+class Storage:
+    ...
+
+
+@component(scope=PROTOTYPE, profiles=("test_metrics", ))
+class Handler:
+    storage: Annotated[Storage, Injectable]
+
+
+@component(scope=PROTOTYPE, profiles=("test_metrics", ))
+class Router:
+    storages: Annotated[list[Storage], Injectable]
+
+
+@autowired_method
+def get_storage(storage: Annotated[Storage, Injectable]) -> Storage:
+    return storage
+
+
+def test_metrics():
+    events = []
+    dm.clear_metrics()
+    dm.enable_metrics(sink=lambda *event: events.append(event))
+    try:
+        with dm.copy():
+            dm.init_profiles("test_metrics")
+            dm.start()
+            for _ in range(3):
+                dm.get_instance(Handler)
+    finally:
+        dm.disable_metrics()
+
+    report = dm.get_metrics()
+    assert report[Handler].calls == 3 and report[Handler].scope == PROTOTYPE
+    assert report[Handler].hits == report[Handler].misses == 0
+    assert (report[Storage].hits, report[Storage].misses) == (2, 1)
+    assert sum(report[Storage].histogram) == 3
+    assert (Storage, SINGLETON, False) in [event[:3] for event in events]
+    dm.clear_metrics()
+    assert not dm.get_metrics()
+    with pytest.raises(AutomnConfigurationError):
+        dm.enable_metrics(sample_rate=0)
+
+
+def test_cached_singletons():
+    dm.clear_metrics()
+    dm.enable_metrics()
+    try:
+        with dm.copy():
+            dm.init_profiles("test_metrics")
+            dm.start()
+            for _ in range(2):
+                dm.get_instance(Router)
+                dm.get_instances(Storage)
+                get_storage()
+    finally:
+        dm.disable_metrics()
+
+    assert (dm.get_metrics()[Storage].hits, dm.get_metrics()[Storage].misses) == (5, 1)
+
+
+def test_sampling():
+    random.seed(0)
+    dm.clear_metrics()
+    dm.enable_metrics(sample_rate=0.25)
+    try:
+        with dm.copy():
+            dm.init_profiles("test_metrics")
+            dm.start()
+            for _ in range(2000):
+                dm.get_instance(Router)
+            collections = dm.get_register()._collections
+            assert collections and all(c.instances is not None for c in collections)
+    finally:
+        dm.disable_metrics()
+
+    # Members of the cached collection are sampled like the collection
+    report = dm.get_metrics()
+    assert 300 < report[Router].calls < 700
+    assert 300 < report[Storage].hits < 700 and report[Storage].misses <= 1
+
+
+def test_failing_sink():
+    def sink(*event) -> None:
+        raise ValueError(event)
+
+    dm.enable_metrics(sink=sink)
+    try:
+        with dm.copy():
+            dm.init_profiles("test_metrics")
+            dm.start()
+            with pytest.warns(RuntimeWarning):
+                assert isinstance(dm.get_instance(Handler).storage, Storage)
+    finally:
+        dm.disable_metrics()
@@ -0,0 +1,98 @@
+from threading import Thread
+from time import sleep
+from typing import Annotated, ClassVar
+import asyncio
+
+import pytest
+
+from autumn.exceptions import AutomnConfigurationError
+from autumn.public import Injectable, Pooled, SINGLETON, component, dm, pre_destroy
+
+
+@component(scope=Pooled(max_size=2, min_size=1), profiles=("test_pool", ))
+class Connection:
+    closed: ClassVar[list["Connection"]] = []
+
+    @pre_destroy
+    def close(self) -> None:
+        self.closed.append(self)
+
+
+@component(scope=Pooled(max_size=1), profiles=("test_pool_async", ))
+class Channel:
+    ...
+
+
+@component(scope=Pooled(), profiles=("test_pool_injected", ))
+class Socket:
+    ...
+
+
+@component(scope=SINGLETON, profiles=("test_pool_injected", ))
+class Client:
+    socket: Annotated[Socket, Injectable]
+
+
+def test_borrow():
+    Connection.closed.clear()
+    with dm.copy():
+        dm.init_profiles("test_pool")
+        dm.start()
+        assert dm.get_pool_metrics()[Connection].idle == 1
+        with dm.borrow(Connection) as first:
+            with dm.borrow(Connection) as second:
+                assert first is not second
+        with dm.borrow(Connection) as third:
+            assert third in (first, second)
+        metrics = dm.get_pool_metrics()[Connection]
+        assert (metrics.size, metrics.idle, metrics.hits, metrics.creations) == (2, 2, 2, 2)
+        with pytest.raises(AutomnConfigurationError):
+            dm.get_instance(Connection)
+    assert set(Connection.closed) == {first, second}
+
+
+def test_wait():
+    borrowed = []
+
+    def work() -> None:
+        with dm.borrow(Connection) as connection:
+            borrowed.append(connection)
+
+    with dm.copy():
+        dm.init_profiles("test_pool")
+        dm.start()
+        with dm.borrow(Connection) as first, dm.borrow(Connection) as second:
+            thread = Thread(target=work)
+            thread.start()
+            while not dm.get_pool_metrics()[Connection].waits:
+                sleep(0.001)
+        thread.join()
+        assert len(borrowed) == 1 and borrowed[0] in (first, second)
+        metrics = dm.get_pool_metrics()[Connection]
+        assert (metrics.size, metrics.idle, metrics.waits) == (2, 2, 1)
+
+
+def test_async_borrow():
+    async def work(channels: list[Channel]) -> None:
+        async with dm.aborrow(Channel) as channel:
+            await asyncio.sleep(0)
+            channels.append(channel)
+
+    async def main() -> list[Channel]:
+        channels = []
+        await asyncio.gather(*(work(channels) for _ in range(3)))
+        return channels
+
+    with dm.copy():
+        dm.init_profiles("test_pool_async")
+        dm.start()
+        channels = asyncio.run(main())
+        assert len(set(channels)) == 1
+        assert dm.get_pool_metrics()[Channel].waits == 2
+
+
+def test_injected():
+    with dm.copy():
+        dm.init_profiles("test_pool_injected")
+        with pytest.raises(AutomnConfigurationError):
+            dm.start()
@@ -0,0 +1,41 @@
+from typing import Annotated
+import time
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.public import Injectable, component, dm
+
+
+@component(scope=SINGLETON, profiles=("test_profiler", ))
+class Storage:
+
+    def __post_init__(self) -> None:
+        time.sleep(0.02)
+
+
+@component(scope=PROTOTYPE, profiles=("test_profiler", ))
+class Handler:
+    storage: Annotated[Storage, Injectable]
+
+
+def test_profiler():
+    dm.clear_profile()
+    dm.enable_profiling()
+    try:
+        with dm.copy():
+            dm.init_profiles("test_profiler")
+            dm.start()
+            dm.get_instance(Handler)
+            dm.get_instance(Handler)
+    finally:
+        dm.disable_profiling()
+
+    profile = dm.get_profile()
+    assert profile[Handler].parsing > 0 and profile[Handler].check > 0
+    assert profile[Handler].calls == 2
+    assert profile[Handler].resolution >= 0.02
+    assert profile[Storage].calls == 2
+    assert 0.02 <= profile[Storage].construction < profile[Handler].resolution + 1e-6
+    stacks = dict(line.rsplit(" ", 1) for line in dm.export_profile().splitlines())
+    assert int(stacks["Handler;Storage"]) >= 20000
+    dm.clear_profile()
+    assert not dm.get_profile() and not dm.export_profile()
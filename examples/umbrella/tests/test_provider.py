@@ -0,0 +1,50 @@
+from typing import Annotated
+import asyncio
+
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.public import Injectable, Provider, component, dm
+
+
+class IAnimal:
+    ...
+
+
+class IFarm:
+    ...
+
+
+@component(scope=PROTOTYPE, profiles=("test_provider", ))
+class Lamb:
+    farm: Annotated[IFarm, Injectable]
+
+
+@component(IAnimal, scope=PROTOTYPE, profiles=("test_provider", ))
+class Goat:
+    ...
+
+
+@component(IAnimal, scope=SINGLETON, profiles=("test_provider", ))
+class Dog:
+    ...
+
+
+@component(IFarm, scope=SINGLETON, profiles=("test_provider", ))
+class Farm:
+    lambs: Annotated[Provider[Lamb], Injectable]
+    animals: Annotated[Provider[list[IAnimal]], Injectable]
+
+
+def test_provider():
+    with dm.copy():
+        dm.init_profiles("test_provider")
+        dm.start()
+        assert dm.get_register().cycles == []
+        farm = dm.get_instance(IFarm)
+        lamb = farm.lambs()
+        assert isinstance(lamb, Lamb) and lamb.farm is farm
+        lambs = farm.lambs.many(3)
+        assert len({id(l) for l in lambs + [lamb]}) == 4
+        assert [type(a) for a in farm.animals()] == [Goat, Dog]
+        assert farm.animals()[0] is not farm.animals()[0]
+        assert farm.animals()[1] is farm.animals()[1]
+        assert len(asyncio.run(farm.lambs.amany(2))) == 2
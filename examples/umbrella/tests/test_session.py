@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated
+import asyncio
+
+import pytest
+
+from autumn.core.scope import SINGLETON
+from autumn.exceptions import AutomnSessionNotEntered
+from autumn.public import Injectable, Session, autowired_method, component, dm
+
+
+@component(scope=SINGLETON, profiles=("test_session", ))
+class Connection:
+    ...
+
+
+@component(scope=Session("request"), profiles=("test_session", ))
+class RequestContext:
+    connection: Annotated[Connection, Injectable]
+
+
+@autowired_method
+def current_context(context: Annotated[RequestContext, Injectable]) -> RequestContext:
+    return context
+
+
+def test_session():
+    with dm.copy():
+        dm.init_profiles("test_session")
+        dm.start()
+        with pytest.raises(AutomnSessionNotEntered):
+            dm.get_instance(RequestContext)
+        with dm.session("request"):
+            first = dm.get_instance(RequestContext)
+            assert current_context() is first
+            assert first.connection is dm.get_instance(Connection)
+            with dm.session("request"):
+                assert dm.get_instance(RequestContext) is not first
+            assert dm.get_instance(RequestContext) is first
+        with dm.session("request"):
+            assert dm.get_instance(RequestContext) is not first
+        with pytest.raises(AutomnSessionNotEntered):
+            dm.get_instance(RequestContext)
+
+
+def test_concurrent_sessions():
+    with dm.copy():
+        dm.init_profiles("test_session")
+        dm.start()
+
+        async def handle():
+            async with dm.session("request"):
+                context = await dm.aget_instance(RequestContext)
+                await asyncio.sleep(0.01)
+                assert await dm.aget_instance(RequestContext) is context
+                return context
+
+        async def main():
+            return await asyncio.gather(*(handle() for _ in range(100)))
+
+        assert len({id(c) for c in asyncio.run(main())}) == 100
+
+        def work(_):
+            with dm.session("request"):
+                return [dm.get_instance(RequestContext) for _ in range(100)]
+
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(work, range(32)))
+        assert all(len({id(c) for c in r}) == 1 for r in results)
+        assert len({id(r[0]) for r in results}) == 32
@@ -0,0 +1,73 @@
+from typing import Annotated
+
+import pytest
+
+from autumn.core.register import Register, describe_annotations, register
+from autumn.core.scope import PROTOTYPE, SINGLETON
+from autumn.public import Injectable, Property, component, dm
+
+
+class IRule:
+    ...
+
+
+@component(IRule, scope=SINGLETON, profiles=("test_snapshot", ))
+class LengthRule:
+    limit: Annotated[int, Property("snapshot.limit")]
+
+
+@component(IRule, scope=SINGLETON, profiles=("test_snapshot", ))
+class EmptyRule:
+    ...
+
+
+@component(scope=PROTOTYPE, profiles=("test_snapshot", ))
+class Validator:
+    rules: Annotated[tuple[IRule, ...], Injectable]
+
+
+def start(path, limit):
+    dm.init_profiles("test_snapshot")
+    dm.init_property("snapshot.limit", limit)
+    dm.init_snapshot(path)
+    dm.start()
+    return dm.get_instance(Validator)
+
+
+def test_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "dm.snapshot"
+    with dm.copy():
+        start(path, 10)
+    assert path.exists()
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Register, "check", lambda *_: pytest.fail("snapshot was not used"))
+        with dm.copy():
+            validator = start(path, 20)
+            assert [type(r) for r in validator.rules] == [LengthRule, EmptyRule]
+            assert validator.rules[0].limit == 20
+
+    path.write_bytes(b"corrupted")
+    with dm.copy():
+        assert start(path, 30).rules[0].limit == 30
+    with monkeypatch.context() as patch:
+        patch.setattr(Register, "check", lambda *_: pytest.fail("snapshot was not used"))
+        with dm.copy():
+            start(path, 40)
+
+
+def test_stale_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "dm.snapshot"
+    with dm.copy():
+        assert isinstance(start(path, 10).rules, tuple)
+
+    # Declared again as after an alias imported from another module changed,
+    # while the file declaring the component stays the same
+    [validator] = [c for c in register._keys.values() if c.cls is Validator]
+    with monkeypatch.context() as patch:
+        patch.setattr(validator, "hints", describe_annotations(type("Validator", (), {
+            "__annotations__": {"rules": Annotated[list[IRule], Injectable]}})))
+        patch.setattr(validator, "dependencies", None)
+        patch.setattr(validator, "properties", None)
+        with dm.copy():
+            assert isinstance(start(path, 10).rules, list)
@@ -0,0 +1,51 @@
+from typing import Annotated, Optional as TypingOptional
+
+import pytest
+
+from autumn.core.register import dependency_descrition
+from autumn.exceptions import AutomnConfigurationError
+from autumn.helpers.type_hints import Collection, Generic, Optional, Particular, extract_from_hint
+from autumn.core.scope import SINGLETON
+from autumn.public import Injectable, component, factory
+
+
+class Item:
+    ...
+
+
+def test_parsed_hints_are_shared():
+    hint = extract_from_hint(Annotated[list[Item], Injectable])
+    assert hint is extract_from_hint(Annotated[list[Item], Injectable])
+    assert hint.type == Collection(list, Particular(Item))
+    assert hash(hint) == hash(extract_from_hint(Annotated[list[Item], Injectable]))
+    assert dependency_descrition(Annotated[list[Item], Injectable]) == (Collection(list, Item), Injectable)
+
+
+def test_unhashable_hint():
+    hint = extract_from_hint(Annotated[Item, {"unhashable": True}])
+    assert hint.type == Particular(Item)
+
+
+def test_equal_hints_of_different_kinds():
+    assert isinstance(extract_from_hint(TypingOptional[Item]), Generic)
+    assert extract_from_hint(Item | None) == Optional(Particular(Item))
+
+
+def test_equal_annotated_hints_of_different_kinds():
+    with pytest.raises(AutomnConfigurationError):
+        dependency_descrition(Annotated[TypingOptional[Item], Injectable])
+    assert dependency_descrition(Annotated[Item | None, Injectable]) == (Optional(Item), Injectable)
+    with pytest.raises(AutomnConfigurationError):
+        dependency_descrition(Annotated[TypingOptional[Item], Injectable])
+
+
+def test_invalid_annotations_reported_on_decoration():
+    with pytest.raises(AutomnConfigurationError):
+        @component(scope=SINGLETON, profiles=("test_never_active", ))
+        class Invalid:
+            item: Annotated[TypingOptional[Item], Injectable]
+
+    with pytest.raises(AutomnConfigurationError):
+        @factory(Item, scope=SINGLETON, profiles=("test_never_active", ))
+        def create_item(item: Annotated[TypingOptional[Item], Injectable]) -> Item:
+            return Item()